@@ -9,18 +9,27 @@
 """
 from __future__ import absolute_import
 
-import pprint
 import shutil
 import sys
 import os
 import re
 import datetime
-import copy
 import codecs
 import gzip
 import bz2
 import lzma
 import logging
+import importlib.util
+
+from functools import lru_cache
+
+# The module pprint is imported lazy in pp(), which is used only for debugging output,
+# to keep the startup of the application short.
+
+# The optional module zstandard is imported only, if a zstd compressed logfile is read.
+HAS_ZSTD = False
+if importlib.util.find_spec('zstandard'):
+    HAS_ZSTD = True
 
 # Own modules
 from .errors import PostfixLogsumsError
@@ -49,6 +58,17 @@ LOG = logging.getLogger(__name__)
 _ = XLATOR.gettext
 
 
+# =============================================================================
+@lru_cache(maxsize=1)
+def get_terminal_width():
+    """Return the width of the current terminal.
+
+    The terminal size is evaluated only once, on first call.
+    """
+    term_size = shutil.get_terminal_size((DEFAULT_TERMINAL_WIDTH, DEFAULT_TERMINAL_HEIGHT))
+    return term_size.columns
+
+
 # =============================================================================
 def pp(value, indent=4, width=None, depth=None):
     """
@@ -58,9 +78,10 @@ def pp(value, indent=4, width=None, depth=None):
     @rtype: str
     """
 
+    import pprint
+
     if not width:
-        term_size = shutil.get_terminal_size((DEFAULT_TERMINAL_WIDTH, DEFAULT_TERMINAL_HEIGHT))
-        width = term_size.columns
+        width = get_terminal_width()
 
     pretty_printer = pprint.PrettyPrinter(indent=indent, width=width, depth=depth)
     return pretty_printer.pformat(value)
@@ -95,7 +116,8 @@ def get_generic_appname(appname=None):
         if v:
             return v
     aname = sys.argv[0]
-    aname = re.sub(r'\.py$', '', aname, flags=re.IGNORECASE)
+    if aname.lower().endswith('.py'):
+        aname = aname[:-3]
     return os.path.basename(aname)
 
 
@@ -109,6 +131,25 @@ def get_smh(seconds):
 
     return (seconds, minutes, hours)
 
+
+# =============================================================================
+def incr_counter(counter, *keys):
+    """Increment a counter in a dict, which may be nested in further dicts.
+
+    The last key is the one of the counter, all other keys are the ones of the nested
+    dicts, which are created, if they don't exist. The counters are kept in plain dicts,
+    so every key is looked up only once.
+    """
+    for key in keys[:-1]:
+        sub_counter = counter.get(key)
+        if sub_counter is None:
+            sub_counter = counter[key] = {}
+        counter = sub_counter
+
+    key = keys[-1]
+    counter[key] = counter.get(key, 0) + 1
+
+
 # =============================================================================
 class PostfixLogParser(object):
     """The underlaying class for parsing Postfix logfiles."""
@@ -132,11 +173,12 @@ class PostfixLogParser(object):
     this_month = today.month
     this_year = today.year
 
-    valid_compressions = ('gzip', 'bzip2', 'xz', 'lzma')
+    valid_compressions = ('gzip', 'bzip2', 'xz', 'lzma', 'zstd')
 
     re_gzip = re.compile(r'\.gz$', re.IGNORECASE)
     re_bzip2 = re.compile(r'\.(bz2?|bzip2?)$', re.IGNORECASE)
     re_lzma = re.compile(r'\.(xz|lzma)$', re.IGNORECASE)
+    re_zstd = re.compile(r'\.zstd?$', re.IGNORECASE)
 
     re_said = re.compile(r'^.* said: ')
     re_said1 = re.compile(r'^.*: *')
@@ -148,6 +190,9 @@ class PostfixLogParser(object):
 
     min_max_len = 4
 
+    # Size of the read buffer of opened logfiles, much greater than the default of 8 KiB
+    read_buffer_size = 1024 * 1024
+
     # -------------------------------------------------------------------------
     def __init__(
             self, appname=None, verbose=0, day=None, syslog_name=DEFAULT_SYSLOG_NAME,
@@ -204,7 +249,7 @@ class PostfixLogParser(object):
                 t_diff = datetime.timedelta(days=1)
                 used_date = self.today - t_diff
             elif day.lower() == 'today':
-                used_date = copy.copy(self.today)
+                used_date = self.today
             else:
                 msg = _(
                     "Wrong day {d!r} given. Valid values are {n}, {y!r} and {t!r} or a valid "
@@ -722,31 +767,35 @@ class PostfixLogParser(object):
 
     # -------------------------------------------------------------------------
     def parse_file(self, logfile):
-        """Parsing a particular logfile."""
+        """Parsing a particular logfile, given as a str or a Path object."""
 
         open_opts = {
             'encoding': self.encoding,
             'errors': 'surrogateescape',
+            'buffering': self.read_buffer_size,
         }
 
+        filename = str(logfile)
         compression = None
 
         if self.compression:
             compression = self.compression
         else:
-            if self.re_gzip.search(logfile.name):
+            if self.re_gzip.search(filename):
                 compression = 'gzip'
-            elif self.re_bzip2.search(logfile.name):
+            elif self.re_bzip2.search(filename):
                 compression = 'bzip2'
-            elif self.re_lzma.search(logfile.name):
+            elif self.re_lzma.search(filename):
                 compression = 'lzma'
+            elif self.re_zstd.search(filename):
+                compression = 'zstd'
 
         if compression:
-            with logfile.open('rb') as fh:
-                return self.parse_fh(fh, filename=str(logfile), compression=compression)
+            with open(filename, 'rb', buffering=self.read_buffer_size) as fh:
+                return self.parse_fh(fh, filename=filename, compression=compression)
         else:
-            with logfile.open('r', **open_opts) as fh:
-                return self.parse_fh(fh, filename=str(logfile))
+            with open(filename, 'r', **open_opts) as fh:
+                return self.parse_fh(fh, filename=filename)
 
     # -------------------------------------------------------------------------
     def parse_fh(self, fh, filename, compression=None):
@@ -781,6 +830,12 @@ class PostfixLogParser(object):
             self.read_lzma(cdata)
             return True
 
+        if compression == 'zstd':
+            LOG.debug(_("Reading {w} compressed file {f!r} ...").format(
+                w='ZSTD', f=filename))
+            self.read_zstd(cdata)
+            return True
+
     # -------------------------------------------------------------------------
     def read_gzip(self, cdata):
 
@@ -808,6 +863,29 @@ class PostfixLogParser(object):
         for line in data.splitlines():
             self.eval_line(line)
 
+    # -------------------------------------------------------------------------
+    def read_zstd(self, cdata):
+
+        if not HAS_ZSTD:
+            msg = _("The Python module {m!r} is needed to read {w} compressed logfiles.").format(
+                m='zstandard', w='ZSTD')
+            raise PostfixLogsumsError(msg)
+
+        import zstandard
+
+        # A decompression object stops at the end of a frame, so a logfile with
+        # concatenated frames is decompressed frame by frame.
+        decompressor = zstandard.ZstdDecompressor()
+        chunks = []
+        while cdata:
+            dobj = decompressor.decompressobj()
+            chunks.append(dobj.decompress(cdata))
+            cdata = dobj.unused_data
+        data = b''.join(chunks).decode(self.encoding, errors='surrogateescape')
+
+        for line in data.splitlines():
+            self.eval_line(line)
+
     # -------------------------------------------------------------------------
     def eval_line(self, line):
 
@@ -886,10 +964,10 @@ class PostfixLogParser(object):
         self._cur_msg = result[1].strip()
 
         if self.results.logdate_oldest is None or self._cur_ts < self.results.logdate_oldest:
-            self.results.logdate_oldest = copy.copy(self._cur_ts)
+            self.results.logdate_oldest = self._cur_ts
 
         if self.results.logdate_latest is None or self._cur_ts > self.results.logdate_latest:
-            self.results.logdate_latest = copy.copy(self._cur_ts)
+            self.results.logdate_latest = self._cur_ts
 
         return True
 
@@ -1030,9 +1108,7 @@ class PostfixLogParser(object):
             mparts = self.re_master.split(self._cur_msg)
             mpart = mparts[1]
             self.results.msgs_total.master += 1
-            if mpart not in self.results.master_msgs:
-                self.results.master_msgs[mpart] = 0
-            self.results.master_msgs[mpart] += 1
+            incr_counter(self.results.master_msgs, mpart)
             return
 
         if self._cur_pf_command == 'smtpd':
@@ -1043,21 +1119,14 @@ class PostfixLogParser(object):
 
     # -------------------------------------------------------------------------
     def _eval_postfix_script(self):
-        qid = self._cur_qid
-
-        if qid not in self.results.postfix_script:
-            self.results.postfix_script[qid] = 0
-        self.results.postfix_script[qid] += 1
+        incr_counter(self.results.postfix_script, self._cur_qid)
 
     # -------------------------------------------------------------------------
     def _eval_postfix_message(self):
 
         m = self.re_pf_message.search(self._cur_msg)
         if m:
-            msg = m.group(1)
-            if msg not in self.results.postfix_messages:
-                self.results.postfix_messages[msg] = 0
-            self.results.postfix_messages[msg] += 1
+            incr_counter(self.results.postfix_messages, m.group(1))
 
     # -------------------------------------------------------------------------
     def eval_smtpd_msg(self):
@@ -1089,7 +1158,7 @@ class PostfixLogParser(object):
                 "qid {q!r}.").format(c=client, d=domain, q=qid)
             LOG.debug(msg)
 
-        self.results.received_messages_per_hour[hour] += 1
+        self.results.received_messages_per_hour.incr(hour)
         self.incr_msgs_per_day('received')
         self.results.msgs_total.received += 1
         self._rcvd_msgs_qid[qid] = domain
@@ -1142,26 +1211,28 @@ class PostfixLogParser(object):
                 del self._connection_times[pid]
 
                 seconds = time_diff.total_seconds()
+                int_seconds = int(seconds)
 
-                self.results.smtpd_messages_per_hour[hour].count += 1
-                self.results.smtpd_messages_per_hour[hour].time_total += seconds
-                if seconds > self.results.smtpd_messages_per_hour[hour].time_max:
-                    self.results.smtpd_messages_per_hour[hour].time_max = seconds
+                hour_stats = self.results.smtpd_messages_per_hour[hour]
+                hour_stats.count += 1
+                hour_stats.time_total += int_seconds
+                if int_seconds > hour_stats.time_max:
+                    hour_stats.time_max = int_seconds
 
                 cur_date = self._cur_ts.date()
                 if cur_date not in self.results.smtpd_per_day:
                     self.results.smtpd_per_day[cur_date] = SmtpdStats()
                 self.results.smtpd_per_day[cur_date].connections += 1
-                self.results.smtpd_per_day[cur_date].connect_time_total += seconds
-                if seconds > self.results.smtpd_per_day[cur_date].connect_time_max:
-                    self.results.smtpd_per_day[cur_date].connect_time_max = seconds
+                self.results.smtpd_per_day[cur_date].connect_time_total += int_seconds
+                if int_seconds > self.results.smtpd_per_day[cur_date].connect_time_max:
+                    self.results.smtpd_per_day[cur_date].connect_time_max = int_seconds
 
                 if host_id not in self.results.smtpd_per_domain:
                     self.results.smtpd_per_domain[host_id] = SmtpdStats()
                 self.results.smtpd_per_domain[host_id].connections += 1
-                self.results.smtpd_per_domain[host_id].connect_time_total += seconds
-                if seconds > self.results.smtpd_per_domain[host_id].connect_time_max:
-                    self.results.smtpd_per_domain[host_id].connect_time_max = seconds
+                self.results.smtpd_per_domain[host_id].connect_time_total += int_seconds
+                if int_seconds > self.results.smtpd_per_domain[host_id].connect_time_max:
+                    self.results.smtpd_per_domain[host_id].connect_time_max = int_seconds
 
                 self.results.msgs_total.connections += 1
                 self.results.connections_time += seconds
@@ -1176,11 +1247,7 @@ class PostfixLogParser(object):
         warn_msg = self.re_warning.sub('', self._cur_msg)
         warn_msg = self.string_trimmer(warn_msg, do_not_trim=self.detail_verbose_msg)
 
-        if cmd not in self.results.warnings:
-            self.results.warnings[cmd] = {}
-        if warn_msg not in self.results.warnings[cmd]:
-            self.results.warnings[cmd][warn_msg] = 0
-        self.results.warnings[cmd][warn_msg] += 1
+        incr_counter(self.results.warnings, cmd, warn_msg)
 
     # -------------------------------------------------------------------------
     def _eval_fatal_cmd(self):
@@ -1190,11 +1257,7 @@ class PostfixLogParser(object):
         fatal_msg = self.re_fatal.sub('', self._cur_msg)
         fatal_msg = self.string_trimmer(fatal_msg, do_not_trim=self.detail_verbose_msg)
 
-        if cmd not in self.results.fatals:
-            self.results.fatals[cmd] = {}
-        if fatal_msg not in self.results.fatals[cmd]:
-            self.results.fatals[cmd][fatal_msg] = 0
-        self.results.fatals[cmd][fatal_msg] += 1
+        incr_counter(self.results.fatals, cmd, fatal_msg)
 
     # -------------------------------------------------------------------------
     def _eval_panic_cmd(self):
@@ -1204,11 +1267,7 @@ class PostfixLogParser(object):
         panic_msg = self.re_panic.sub('', self._cur_msg)
         panic_msg = self.string_trimmer(panic_msg, do_not_trim=self.detail_verbose_msg)
 
-        if cmd not in self.results.panics:
-            self.results.panics[cmd] = {}
-        if panic_msg not in self.results.panics[cmd]:
-            self.results.panics[cmd][panic_msg] = 0
-        self.results.panics[cmd][panic_msg] += 1
+        incr_counter(self.results.panics, cmd, panic_msg)
 
     # -------------------------------------------------------------------------
     def _incr_cleanup_msg(self, counter_name, part, cmd_msg, cmd='cleanup'):
@@ -1217,13 +1276,7 @@ class PostfixLogParser(object):
             setattr(self.results, counter_name, {})
         counter = getattr(self.results, counter_name)
 
-        if cmd not in counter:
-            counter[cmd] = {}
-        if part not in counter[cmd]:
-            counter[cmd][part] = {}
-        if cmd_msg not in counter[cmd][part]:
-            counter[cmd][part][cmd_msg] = 0
-        counter[cmd][part][cmd_msg] += 1
+        incr_counter(counter, cmd, part, cmd_msg)
 
     # -------------------------------------------------------------------------
     def _eval_cleanup_cmd(self, subtype, part, cmd_msg):
@@ -1235,7 +1288,7 @@ class PostfixLogParser(object):
             cmd_msg = self.string_trimmer(cmd_msg, do_not_trim=self.detail_verbose_msg)
 
         hour = self._cur_ts.hour
-        self.results.rejected_messages_per_hour[hour] += 1
+        self.results.rejected_messages_per_hour.incr(hour)
 
         self.incr_msgs_per_day('rejected')
 
@@ -1308,7 +1361,7 @@ class PostfixLogParser(object):
         # counter += 1
 
         hour = self._cur_ts.hour
-        self.results.rejected_messages_per_hour[hour] += 1
+        self.results.rejected_messages_per_hour.incr(hour)
 
         self.incr_msgs_per_day('rejected')
 
@@ -1355,16 +1408,7 @@ class PostfixLogParser(object):
     # -------------------------------------------------------------------------
     def _incr_reject_counter(self, rtype, reason, rdata):
 
-        if rtype not in self.results.rejects:
-            self.results.rejects[rtype] = {}
-
-        if reason not in self.results.rejects[rtype]:
-            self.results.rejects[rtype][reason] = {}
-
-        if rdata not in self.results.rejects[rtype][reason]:
-            self.results.rejects[rtype][reason][rdata] = 0
-
-        self.results.rejects[rtype][reason][rdata] += 1
+        incr_counter(self.results.rejects, rtype, reason, rdata)
 
     # -------------------------------------------------------------------------
     def _eval_reject_msg(self):
@@ -1431,8 +1475,9 @@ class PostfixLogParser(object):
 
         m = self.re_relay.search(self._cur_msg)
         if m:
+            # The delays are counted in whole seconds.
             self._eval_relayed_msg(
-                addr=m['to'], relay=m['relay'], delay=float(m['delay']),
+                addr=m['to'], relay=m['relay'], delay=int(float(m['delay'])),
                 status=m['status'], rest=m['rest'])
             return
 
@@ -1551,11 +1596,7 @@ class PostfixLogParser(object):
     # -------------------------------------------------------------------------
     def _inc_deferred(self, cmd, reason):
 
-        if cmd not in self.results.deferred:
-            self.results.deferred[cmd] = {}
-        if reason not in self.results.deferred[cmd]:
-            self.results.deferred[cmd][reason] = 0
-        self.results.deferred[cmd][reason] += 1
+        incr_counter(self.results.deferred, cmd, reason)
 
     # -------------------------------------------------------------------------
     def _eval_deferred_msg(self, addr, domain, relay, delay, rest):
@@ -1573,7 +1614,7 @@ class PostfixLogParser(object):
                     reason = self.re_connect_to.sub('', reason)
                 self._inc_deferred(self._cur_pf_command, reason)
 
-        self.results.deferred_messages_per_hour[hour] += 1
+        self.results.deferred_messages_per_hour.incr(hour)
         self.incr_msgs_per_day('deferred')
         self.results.msgs_total.deferrals += 1
 
@@ -1590,11 +1631,7 @@ class PostfixLogParser(object):
     # -------------------------------------------------------------------------
     def _inc_bounced(self, relay, reason):
 
-        if relay not in self.results.bounced:
-            self.results.bounced[relay] = {}
-        if reason not in self.results.bounced[relay]:
-            self.results.bounced[relay][reason] = 0
-        self.results.bounced[relay][reason] += 1
+        incr_counter(self.results.bounced, relay, reason)
 
     # -------------------------------------------------------------------------
     def _eval_bounced_msg(self, addr, domain, relay, delay, rest):
@@ -1610,7 +1647,7 @@ class PostfixLogParser(object):
                     reason = self.re_three_digits_at_start.sub('', reason)
                 self._inc_bounced(relay, reason)
 
-        self.results.bounced_messages_per_hour[hour] += 1
+        self.results.bounced_messages_per_hour.incr(hour)
         self.incr_msgs_per_day('bounced')
         self.results.msgs_total.bounced += 1
 
@@ -1636,7 +1673,7 @@ class PostfixLogParser(object):
         self.results.rcpt_user[addr].count += 1
 
         hour = self._cur_ts.hour
-        self.results.delivered_messages_per_hour[hour] += 1
+        self.results.delivered_messages_per_hour.incr(hour)
         self.incr_msgs_per_day('sent')
         self.results.msgs_total.delivered += 1
 
@@ -1660,7 +1697,7 @@ class PostfixLogParser(object):
         hour = self._cur_ts.hour
         qid = self._cur_qid
 
-        self.results.received_messages_per_hour[hour] += 1
+        self.results.received_messages_per_hour.incr(hour)
         self.incr_msgs_per_day('received')
         self.results.msgs_total.received += 1
         self._rcvd_msgs_qid[qid] = 'pickup'
@@ -1678,11 +1715,8 @@ class PostfixLogParser(object):
             self.results.smtp_connections['total'] += 1
             self.results.smtp_connections['trusted'] += 1
             if self.detail_smtp:
-                if smtp_target not in self.results.smtp_connection_details['trusted']:
-                    self.results.smtp_connection_details['trusted'][smtp_target] = {}
-                if smtp_msg not in self.results.smtp_connection_details['trusted'][smtp_target]:
-                    self.results.smtp_connection_details['trusted'][smtp_target][smtp_msg] = 0
-                self.results.smtp_connection_details['trusted'][smtp_target][smtp_msg] += 1
+                incr_counter(
+                    self.results.smtp_connection_details['trusted'], smtp_target, smtp_msg)
             return
 
         m = self.re_smtp_connect_to_untrusted.search(self._cur_msg)
@@ -1692,11 +1726,8 @@ class PostfixLogParser(object):
             self.results.smtp_connections['total'] += 1
             self.results.smtp_connections['untrusted'] += 1
             if self.detail_smtp:
-                if smtp_target not in self.results.smtp_connection_details['untrusted']:
-                    self.results.smtp_connection_details['untrusted'][smtp_target] = {}
-                if smtp_msg not in self.results.smtp_connection_details['untrusted'][smtp_target]:
-                    self.results.smtp_connection_details['untrusted'][smtp_target][smtp_msg] = 0
-                self.results.smtp_connection_details['untrusted'][smtp_target][smtp_msg] += 1
+                incr_counter(
+                    self.results.smtp_connection_details['untrusted'], smtp_target, smtp_msg)
             return
 
         m = self.re_smtp_connect_to.search(self._cur_msg)
@@ -1705,11 +1736,8 @@ class PostfixLogParser(object):
             smtp_msg = m.group(2)
             self.results.smtp_connections['other'] += 1
             if self.detail_smtp:
-                if smtp_target not in self.results.smtp_connection_details['other']:
-                    self.results.smtp_connection_details['other'][smtp_target] = {}
-                if smtp_msg not in self.results.smtp_connection_details['other'][smtp_target]:
-                    self.results.smtp_connection_details['other'][smtp_target][smtp_msg] = 0
-                self.results.smtp_connection_details['other'][smtp_target][smtp_msg] += 1
+                incr_counter(
+                    self.results.smtp_connection_details['other'], smtp_target, smtp_msg)
             return
 
         if not self.detail_smtp:
@@ -1732,11 +1760,7 @@ class PostfixLogParser(object):
                 LOG.debug(msg)
             return
 
-        if smtp_target not in self.results.smtp_messages:
-            self.results.smtp_messages[smtp_target] = {}
-        if smtp_msg not in self.results.smtp_messages[smtp_target]:
-            self.results.smtp_messages[smtp_target] = 0
-        self.results.smtp_messages[smtp_target] += 1
+        incr_counter(self.results.smtp_messages, smtp_target, smtp_msg)
 
 
 # =============================================================================
@@ -14,40 +14,36 @@ import sys
 import os
 import logging
 import argparse
-import traceback
 import datetime
-import copy
 import re
-import textwrap
-import shutil
 import locale
 import json
+import heapq
+import importlib.util
 
+# The modules textwrap, traceback and yaml are imported lazy in the methods,
+# which are needing them, to keep the startup of the application short.
 HAS_YAML = False
-try:
-    import yaml
+if importlib.util.find_spec('yaml'):
     HAS_YAML = True
-except ImportError:
-    pass
 
 # from argparse import RawDescriptionHelpFormatter
 from argparse import RawTextHelpFormatter
 
-from pathlib import Path
-
-from functools import cmp_to_key
+from socket import inet_pton, AF_INET
+from stat import S_ISREG
 
-from locale import strcoll, format_string
+from functools import lru_cache
 
-from operator import itemgetter
+from locale import strxfrm, format_string
 
 LOG = logging.getLogger(__name__)
 
 from . import __version__ as GLOBAL_VERSION
 from . import pp, to_bytes, MAX_TERMINAL_WIDTH
-from . import DEFAULT_TERMINAL_WIDTH, DEFAULT_TERMINAL_HEIGHT
+from . import get_terminal_width
 from . import get_generic_appname, get_smh
-from . import PostfixLogParser
+from . import PostfixLogParser, HAS_ZSTD
 
 from .xlate import XLATOR, format_list
 
@@ -57,35 +53,35 @@ __version__ = '0.8.4'
 _ = XLATOR.gettext
 ngettext = XLATOR.ngettext
 
+# Limits, divisors and units for shortening big numbers, the biggest first
+INT_UNITS = (
+    (PostfixLogParser.div_by_one_gb_at, PostfixLogParser.one_gb, 'G'),
+    (PostfixLogParser.div_by_one_mb_at, PostfixLogParser.one_mb, 'M'),
+    (PostfixLogParser.div_by_one_kb_at, PostfixLogParser.one_kb, 'K'),
+)
 
-# =============================================================================
-class NonNegativeItegerOptionAction(argparse.Action):
 
-    # -------------------------------------------------------------------------
-    def __call__(self, parser, namespace, value, option_string=None):
-
-        try:
-            val = int(value)
-        except Exception as e:
-            msg = _("Got a {c} for converting {v!r} into an integer value: {e}").format(
-                c=e.__class__.__name__, v=value, e=e)
-            raise argparse.ArgumentError(self, msg)
+# =============================================================================
+def non_negative_int(value):
+    """Typecast the given option value into a non negative integer for argparse."""
+    try:
+        val = int(value)
+    except (ValueError, TypeError) as e:
+        msg = _("Got a {c} for converting {v!r} into an integer value: {e}").format(
+            c=e.__class__.__name__, v=value, e=e)
+        raise argparse.ArgumentTypeError(msg)
 
-        if val < 0:
-            msg = _("The option must not be negative (given: {}).").format(value)
-            raise argparse.ArgumentError(self, msg)
+    if val < 0:
+        msg = _("The option must not be negative (given: {}).").format(value)
+        raise argparse.ArgumentTypeError(msg)
 
-        setattr(namespace, self.dest, val)
+    return val
 
 
 # =============================================================================
 class FilterDayOptionAction(argparse.Action):
 
-    # -------------------------------------------------------------------------
-    def __init__(self, option_strings, *args, **kwargs):
-        """Initialise a FilterDayOptionAction object."""
-        super(FilterDayOptionAction, self).__init__(
-            option_strings=option_strings, *args, **kwargs)
+    re_iso_day = re.compile(r'^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})$')
 
     # -------------------------------------------------------------------------
     def __call__(self, parser, namespace, value, option_string=None):
@@ -98,31 +94,61 @@ class FilterDayOptionAction(argparse.Action):
             t_diff = datetime.timedelta(days=1)
             used_day = datetime.date.today() - t_diff
         else:
-            pattern = r'^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})$'
-            m = re.match(pattern, val)
+            m = self.re_iso_day.match(val)
             if m:
                 try:
                     used_day = datetime.date(int(m['year']), int(m['month']), int(m['day']))
                 except Exception as e:
                     msg = _("Invalid date as day {!r} given").format(value)
-                    msg += ': ' + str(e)
-                    raise argparse.ArgumentError(self, msg)
+                    raise argparse.ArgumentError(self, f'{msg}: {e}')
             else:
-                msg = _("Invalid date as day {!r} given").format(value) + '.'
-                raise argparse.ArgumentError(self, msg)
+                msg = _("Invalid date as day {!r} given").format(value)
+                raise argparse.ArgumentError(self, f'{msg}.')
 
         setattr(namespace, self.dest, used_day)
 
 
 # =============================================================================
 class LogFilesOptionAction(argparse.Action):
-    """An argparse action for logfiles."""
+    """An argparse action for logfiles.
+
+    It validates the given logfiles and stores their resolved paths, not opened
+    file objects (like argparse.FileType would do). The parser opens the logfiles
+    one after another, so there are never all given logfiles opened at the same
+    time, and it can open compressed logfiles in binary mode.
+    """
+
+    max_serial_checks = 4
+    max_check_workers = 16
 
     # -------------------------------------------------------------------------
-    def __init__(self, option_strings, *args, **kwargs):
-        """Initialise a LogFilesOptionAction object."""
-        super(LogFilesOptionAction, self).__init__(
-            option_strings=option_strings, *args, **kwargs)
+    def _check_logfile(self, logfile):
+        """Check the given logfile and return its resolved path."""
+        # One stat() call covers both the existence and the file type check.
+        try:
+            fstat = os.stat(logfile)
+        except (FileNotFoundError, NotADirectoryError):
+            msg = _("Logfile {!r} does not exists.").format(logfile)
+            raise argparse.ArgumentError(self, msg)
+        except OSError as e:
+            msg = _("Logfile {f!r} is not accessible: {e}").format(f=logfile, e=e.strerror)
+            raise argparse.ArgumentError(self, msg)
+
+        if not S_ISREG(fstat.st_mode):
+            msg = _("File {!r} is not a regular file.").format(logfile)
+            raise argparse.ArgumentError(self, msg)
+
+        if not os.access(logfile, os.R_OK):
+            msg = _("File {!r} is not readable.").format(logfile)
+            raise argparse.ArgumentError(self, msg)
+
+        if not HAS_ZSTD and PostfixLogParser.re_zstd.search(logfile):
+            msg = _(
+                "Logfile {f!r} is {w} compressed, but the Python module {m!r} "
+                "is not installed.").format(f=logfile, w='ZSTD', m='zstandard')
+            raise argparse.ArgumentError(self, msg)
+
+        return os.path.realpath(logfile)
 
     # -------------------------------------------------------------------------
     def __call__(self, parser, namespace, values, option_string=None):
@@ -136,58 +162,113 @@ class LogFilesOptionAction(argparse.Action):
         else:
             all_files = [values]
 
-        logfiles = []
-        for logfile in all_files:
+        # Equal arguments are checked only once.
+        all_files = list(dict.fromkeys(all_files))
 
-            path = Path(logfile)
-            if not path.exists():
-                msg = _("Logfile {!r} does not exists.").format(logfile)
-                raise argparse.ArgumentError(self, msg)
+        # The checks are I/O bound, so many logfiles are checked in parallel threads.
+        # Executor.map() keeps the order, so the first failing file is reported.
+        if len(all_files) > self.max_serial_checks:
+            from concurrent.futures import ThreadPoolExecutor
+            workers = min(self.max_check_workers, len(all_files))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                real_paths = list(executor.map(self._check_logfile, all_files))
+        else:
+            real_paths = [self._check_logfile(logfile) for logfile in all_files]
 
-            if not path.is_file():
-                msg = _("File {!r} is not a regular file.").format(logfile)
-                raise argparse.ArgumentError(self, msg)
+        # The same file given multiple times is parsed only once.
+        logfiles = list(dict.fromkeys(real_paths))
 
-            if not os.access(str(path), os.R_OK):
-                msg = _("File {!r} is not readable.").format(logfile)
-                raise argparse.ArgumentError(self, msg)
+        setattr(namespace, self.dest, logfiles)
 
-            logfiles.append(path.resolve())
+# =============================================================================
+class WrappingHelpFormatter(RawTextHelpFormatter):
+    """A help formatter, which keeps the line breaks of the help texts.
+
+    Each line of a help text or of the description is wrapped as a paragraph
+    of its own to the max terminal width. This is done only when the help is
+    really printed, not already when defining the arguments.
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, prog, indent_increment=2, max_help_position=24, width=None):
+        if width is None:
+            width = get_max_terminal_width()
+        super().__init__(
+            prog, indent_increment=indent_increment, max_help_position=max_help_position,
+            width=width)
+
+    # -------------------------------------------------------------------------
+    def _split_lines(self, text, width):
+        wrapper = get_text_wrapper(width)
+        lines = []
+        for line in text.splitlines():
+            lines.extend(wrapper.wrap(line) or [''])
+        return lines
+
+    # -------------------------------------------------------------------------
+    def _fill_text(self, text, width, indent):
+        return '\n'.join(indent + line for line in self._split_lines(text, width))
 
-        setattr(namespace, self.dest, logfiles)
 
 # =============================================================================
-def adj_int_units(value):
+def get_max_terminal_width():
+    """Return the width of the current terminal, but at most MAX_TERMINAL_WIDTH."""
+    return min(get_terminal_width(), MAX_TERMINAL_WIDTH)
 
-    val = value
-    unit = ' '
-    if value > PostfixLogParser.div_by_one_gb_at:
-        val = value / PostfixLogParser.one_gb
-        unit = 'G'
-    elif value > PostfixLogParser.div_by_one_mb_at:
-        val = value / PostfixLogParser.one_mb
-        unit = 'M'
-    elif value > PostfixLogParser.div_by_one_kb_at:
-        val = value / PostfixLogParser.one_kb
-        unit = 'K'
-    elif not value:
-        val = 0
 
-    return {'value': val, 'unit': unit}
+# =============================================================================
+def name_sort_key(name):
+    """Return a sort key for a host name, a domain name or an IPv4 address.
+
+    IPv4 addresses are sorted by their octets before all other names,
+    all other names case insensitive by the collation of the current locale.
+    """
+    # inet_pton() accepts only the strict dotted decimal notation, and it returns
+    # the address in network byte order, which sorts like the octets.
+    if name.count('.') == 3:
+        try:
+            return (0, inet_pton(AF_INET, name))
+        except (OSError, ValueError):
+            pass
+    return (1, strxfrm(name.casefold()))
+
+
+# =============================================================================
+@lru_cache(maxsize=8)
+def get_text_wrapper(width):
+    """Return a TextWrapper object for the given width.
+
+    The help texts are all wrapped to one of a few widths, so the wrapper
+    objects are created once and reused.
+    """
+    import textwrap
+
+    return textwrap.TextWrapper(width=width)
 
 
 # =============================================================================
-def ci_cmp(one, two):
-    """Comparing two strings case insensitive."""
-    if one.lower() < two.lower():
-        return -1
-    if one.lower() > two.lower():
-        return 1
-    if one < two:
-        return -1
-    if one > two:
-        return 1
-    return 0
+@lru_cache(maxsize=64)
+def underline(length, char='-'):
+    """Return the line of the given length to print under a title.
+
+    Most of the titles have the same few lengths, so the lines are created
+    once and reused.
+    """
+    return char * length
+
+
+# =============================================================================
+def adj_int_units(value):
+    """Return a tuple of the value, divided by its unit, and the unit."""
+    if not value:
+        return 0, ' '
+
+    for limit, divisor, unit in INT_UNITS:
+        if value > limit:
+            return value / divisor, unit
+
+    return value, ' '
+
 
 # =============================================================================
 def adj_int_units_localized(value, digits=1, dec_digits=0, no_unit=False):
@@ -196,16 +277,12 @@ def adj_int_units_localized(value, digits=1, dec_digits=0, no_unit=False):
     unit = ' '
     if not value:
         val = 0
-    if not no_unit:
-        if value > PostfixLogParser.div_by_one_gb_at:
-            val = value / PostfixLogParser.one_gb
-            unit = 'G'
-        elif value > PostfixLogParser.div_by_one_mb_at:
-            val = value / PostfixLogParser.one_mb
-            unit = 'M'
-        elif value > PostfixLogParser.div_by_one_kb_at:
-            val = value / PostfixLogParser.one_kb
-            unit = 'K'
+    elif not no_unit:
+        for limit, divisor, unit_char in INT_UNITS:
+            if value > limit:
+                val = value / divisor
+                unit = unit_char
+                break
 
     tpl = '%{}.0f'.format(digits)
     if dec_digits:
@@ -241,118 +318,82 @@ def adj_time_units(seconds, digits=1, dec_digits=1):
 # =============================================================================
 class PostfixLogsumsApp(object):
 
-    term_size = shutil.get_terminal_size((DEFAULT_TERMINAL_WIDTH, DEFAULT_TERMINAL_HEIGHT))
-    max_width = term_size.columns
-    if max_width > MAX_TERMINAL_WIDTH:
-        max_width = MAX_TERMINAL_WIDTH
-
-    re_first_letter = re.compile(r'^(.)(.*)')
-    pat_ipv4_tuple = r'(\d|[1-9]\d|1\d\d|2(?:[04]\d|5[0-5]))'
-    pat_ipv4 = r'^' + r'.'.join(pat_ipv4_tuple) + r'$'
-    re_ipv4 = re.compile(pat_ipv4)
-
     re_mailsplit = re.compile(r'@')
     re_maildomain = re.compile(r'^(.*)\.([^\.]+)\.([^\.]{3}|[^\.]{2,3}\.[^\.]{2})$')
     re_bang_path = re.compile(r'^.*!')
 
     hours_per_day = HOURS_PER_DAY
 
+    # The log formats by verbosity level
+    log_formats = {
+        0: '{appname}: %(levelname)s - %(message)s',
+        1: '[%(asctime)s]: {appname}: %(name)s %(levelname)s - %(message)s',
+        2: '[%(asctime)s]: {appname}: %(name)s(%(lineno)d) %(funcName)s() '
+           '%(levelname)s - %(message)s',
+    }
+
+    # The properties included in the result of as_dict()
+    as_dict_properties = (
+        'appname', 'appname_capitalized', 'initialized', 'detail', 'detail_bounce',
+        'detail_deferral', 'detail_host', 'detail_reject', 'detail_smtp',
+        'detail_smtpd_warning', 'detail_user', 'detail_verbose_msg', 'quiet', 'version',
+        'verbose')
+
     output_formats = ['txt', 'json']
     if HAS_YAML:
         output_formats.append('yaml')
 
     # -------------------------------------------------------------------------
     @classmethod
-    def sorted_keys_by_count_and_key(cls, data):
-        """Returns all keys of tha data dict sorted."""
-        sorted_keys = []
+    def sorted_items_by_count_and_key(cls, data, limit=None):
+        """Returns all (key, count) items of the data dict sorted,
+        or only the first limit items."""
 
         # ---------------------------------------------
-        def sort_by_count_and_key(key_one, key_two):
-            val_one = data[key_one]
-            val_two = data[key_two]
-            if val_one != val_two:
-                if val_one < val_two:
-                    return 1
-                else:
-                    return -1
-            lkey_one = key_one.lower()
-            lkey_two = key_two.lower()
-            m_one = cls.re_ipv4.match(key_one)
-            m_two = cls.re_ipv4.match(key_two)
-            if m_one and m_two:
-                lkey_one = ''.join(map(lambda x: chr(int(x)), m_one.groups()))
-                lkey_two = ''.join(map(lambda x: chr(int(x)), m_two.groups()))
-            return strcoll(lkey_one, lkey_two)
+        def by_count_and_key(item):
+            return (-item[1], name_sort_key(item[0]))
 
-        for key in sorted(data.keys(), key=cmp_to_key(sort_by_count_and_key)):
-            sorted_keys.append(key)
+        if limit is not None and limit < len(data):
+            return heapq.nsmallest(limit, data.items(), key=by_count_and_key)
+        return sorted(data.items(), key=by_count_and_key)
 
-        return sorted_keys
+    # -------------------------------------------------------------------------
+    @classmethod
+    def sorted_keys_by_count_and_key(cls, data, limit=None):
+        """Returns all keys of tha data dict sorted, or only the first limit keys."""
+        return [item[0] for item in cls.sorted_items_by_count_and_key(data, limit)]
 
     # -------------------------------------------------------------------------
     @classmethod
     def sorted_keys_of_msg_stats(cls, data):
         """Returns all keys of tha data dict sorted."""
-        sorted_keys = []
 
         # ---------------------------------------------
-        def by_count_then_size(key_one, key_two):
-            stats_one = data[key_one]
-            stats_two = data[key_two]
+        def by_count_then_size(key):
+            stats = data[key]
+            return (-stats.count, -stats.size)
 
-            if stats_one.count != stats_two.count:
-                if stats_one.count > stats_two.count:
-                    return -1
-                else:
-                    return 1
-
-            if stats_one.size > stats_two.size:
-                return -1
-            if stats_one.size < stats_two.size:
-                return 1
-            return 0
-
-        for key in sorted(data.keys(), key=cmp_to_key(by_count_then_size)):
-            sorted_keys.append(key)
-
-        return sorted_keys
+        return sorted(data.keys(), key=by_count_then_size)
 
     # -------------------------------------------------------------------------
     @classmethod
     def sorted_keys_of_smtpd_stats(cls, data):
         """Returns all keys of tha data dict sorted."""
-        sorted_keys = []
 
         # ---------------------------------------------
-        def by_count_then_time(key_one, key_two):
-            stats_one = data[key_one]
-            stats_two = data[key_two]
-
-            if stats_one.connections != stats_two.connections:
-                if stats_one.connections > stats_two.connections:
-                    return -1
-                else:
-                    return 1
-
-            if stats_one.connect_time_total > stats_two.connect_time_total:
-                return -1
-            if stats_one.connect_time_total < stats_two.connect_time_total:
-                return 1
-            return 0
+        def by_count_then_time(key):
+            stats = data[key]
+            return (-stats.connections, -stats.connect_time_total)
 
-        for key in sorted(data.keys(), key=cmp_to_key(by_count_then_time)):
-            sorted_keys.append(key)
-
-        return sorted_keys
+        return sorted(data.keys(), key=by_count_then_time)
 
     # -------------------------------------------------------------------------
     @classmethod
     def wrap_msg(cls, message, width=None):
         """Wrap the given message to the max terminal width ..."""
         if width is None:
-            width = cls.max_width
-        return textwrap.fill(message, width)
+            width = get_max_terminal_width()
+        return get_text_wrapper(width).fill(message)
 
     # -------------------------------------------------------------------------
     def __init__(self):
@@ -362,6 +403,7 @@ class PostfixLogsumsApp(object):
         self._verbose = 0
         self._quiet = False
         self._initialized = False
+        self._detail = 1
         self.parser = None
 
         self.init_arg_parser()
@@ -370,23 +412,6 @@ class PostfixLogsumsApp(object):
 
         self.nr_days = 0
 
-        compression = None
-        if self.args.gzip:
-            compression = 'gzip'
-        elif self.args.bzip2:
-            compression = 'bzip2'
-        elif self.args.xz:
-            compression = 'lzma'
-
-        self.parser = PostfixLogParser(
-            appname=self.appname, verbose=self.verbose, day=self.args.day,
-            compression=compression, zero_fill=self.args.zero_fill, detail_smtp=self.detail_smtp,
-            detail_reject=self.detail_reject, detail_smtpd_warning=self.detail_smtpd_warning,
-            detail_bounce=self.detail_bounce, detail_deferral=self.detail_deferral,
-            ignore_case=self.args.ignore_case, rej_add_from=self.args.rej_add_from,
-            smtpd_stats=self.args.smtpd_stats, extended=self.args.extended,
-            verp_mung=self.args.verp_mung, detail_verbose_msg=self.detail_verbose_msg)
-
         self._initialized = True
 
     # -----------------------------------------------------------
@@ -404,15 +429,19 @@ class PostfixLogsumsApp(object):
             if v:
                 self._appname = v
 
+    # -----------------------------------------------------------
+    @property
+    def max_width(self):
+        """The maximum width of the output, depending on the terminal size."""
+        return get_max_terminal_width()
+
     # -----------------------------------------------------------
     @property
     def appname_capitalized(self):
         """The name of the current running application withe first character
         as a capital."""
-        match = self.re_first_letter.match(self.appname)
-        if match:
-            return match.group(1).upper() + match.group(2)
-        return self.appname
+        appname = self.appname
+        return appname[:1].upper() + appname[1:]
 
     # -----------------------------------------------------------
     @property
@@ -458,102 +487,61 @@ class PostfixLogsumsApp(object):
     @property
     def detail(self):
         """Sets all --*-detail, -h and -u. Is over-ridden by individual settings."""
-        if not hasattr(self, 'args'):
-            return 1
-        if not self.args:
-            return 1
-        return getattr(self.args, 'detail', 1)
+        return self._detail
 
     # -----------------------------------------------------------
-    @property
-    def detail_bounce(self):
-        """Limit detailed bounce reports."""
-        if not hasattr(self, 'args'):
+    def _get_detail(self, name):
+        """Return the value of the given --*-detail option, or of --detail, if
+        the option was not given."""
+        args = getattr(self, 'args', None)
+        if not args:
             return None
-        if not self.args:
-            return None
-        det = getattr(self.args, 'detail_bounce', None)
+        det = getattr(args, name, None)
         if det is None:
-            return self.detail
+            return self._detail
         return det
 
+    # -----------------------------------------------------------
+    @property
+    def detail_bounce(self):
+        """Limit detailed bounce reports."""
+        return self._get_detail('detail_bounce')
+
     # -----------------------------------------------------------
     @property
     def detail_deferral(self):
         """Limit detailed deferral reports."""
-        if not hasattr(self, 'args'):
-            return None
-        if not self.args:
-            return None
-        det = getattr(self.args, 'detail_deferral', None)
-        if det is None:
-            return self.detail
-        return det
+        return self._get_detail('detail_deferral')
 
     # -----------------------------------------------------------
     @property
     def detail_host(self):
         """Limit detailed host reports."""
-        if not hasattr(self, 'args'):
-            return None
-        if not self.args:
-            return None
-        det = getattr(self.args, 'detail_host', None)
-        if det is None:
-            return self.detail
-        return det
+        return self._get_detail('detail_host')
 
     # -----------------------------------------------------------
     @property
     def detail_reject(self):
         """Limit detailed reject reports."""
-        if not hasattr(self, 'args'):
-            return None
-        if not self.args:
-            return None
-        det = getattr(self.args, 'detail_reject', None)
-        if det is None:
-            return self.detail
-        return det
+        return self._get_detail('detail_reject')
 
     # -----------------------------------------------------------
     @property
     def detail_smtp(self):
         """Limit detailed smtp reports."""
-        if not hasattr(self, 'args'):
-            return None
-        if not self.args:
-            return None
-        det = getattr(self.args, 'detail_smtp', None)
-        if det is None:
-            return self.detail
-        return det
+        return self._get_detail('detail_smtp')
 
     # -----------------------------------------------------------
     @property
     def detail_smtpd_warning(self):
         """Limit detailed smtpd warnings reports."""
-        if not hasattr(self, 'args'):
-            return None
-        if not self.args:
-            return None
-        det = getattr(self.args, 'detail_smtpd_warning', None)
-        if det is None:
-            return self.detail
-        return det
+        return self._get_detail('detail_smtpd_warning')
 
     # -----------------------------------------------------------
     @property
     def detail_user(self):
         """Limit detailed user reports."""
-        if not hasattr(self, 'args'):
-            return None
-        if not self.args:
-            return None
-        det = getattr(self.args, 'detail_user', None)
-        if det is None:
-            return self.detail
-        return det
+        return self._get_detail('detail_user')
 
     # -----------------------------------------------------------
     @property
@@ -582,38 +570,26 @@ class PostfixLogsumsApp(object):
         """
         Transforms the elements of the object into a dict
 
-        @param short: don't include local properties in resulting dict.
+        @param short: don't include local properties and the complete parser
+                      with all its results in resulting dict.
         @type short: bool
 
         @return: structure as dict
         @rtype:  dict
         """
-
-        res = {}
-        for key in self.__dict__:
-            if short and key.startswith('_') and not key.startswith('__'):
-                continue
-            res[key] = self.__dict__[key]
+        if short:
+            res = {
+                key: value for key, value in self.__dict__.items()
+                if key[0] != '_' or key[1:2] == '_'}
+        else:
+            res = dict(self.__dict__)
 
         res['__class_name__'] = self.__class__.__name__
-        res['appname'] = self.appname
-        res['appname_capitalized'] = self.appname_capitalized
-        res['args'] = copy.copy(self.args.__dict__)
-        res['initialized'] = self.initialized
-        res['detail'] = self.detail
-        res['detail_bounce'] = self.detail_bounce
-        res['detail_deferral'] = self.detail_deferral
-        res['detail_host'] = self.detail_host
-        res['detail_reject'] = self.detail_reject
-        res['detail_smtp'] = self.detail_smtp
-        res['detail_smtpd_warning'] = self.detail_smtpd_warning
-        res['detail_user'] = self.detail_user
-        res['detail_verbose_msg'] = self.detail_verbose_msg
-        if self.parser:
+        for key in self.as_dict_properties:
+            res[key] = getattr(self, key)
+        res['args'] = dict(vars(self.args))
+        if self.parser and not short:
             res['parser'] = self.parser.as_dict(short=short)
-        res['quiet'] = self.quiet
-        res['version'] = self.version
-        res['verbose'] = self.verbose
 
         return res
 
@@ -625,9 +601,7 @@ class PostfixLogsumsApp(object):
         @raise PBApplicationError: on some errors
 
         """
-
         appname = self.appname_capitalized
-        arg_width = self.max_width - 24
 
         desc = []
         desc.append(_('{} is a log analyzer/summarizer for the Postfix MTA.').format(appname))
@@ -639,17 +613,10 @@ class PostfixLogsumsApp(object):
             'volumes, rejected and bounced email, and server warnings, '
             'errors and panics.').format(appname))
 
-        description = ''
-        for des in desc:
-            des = self.wrap_msg(des)
-            if description:
-                description += '\n\n'
-            description += des
-
         self.arg_parser = argparse.ArgumentParser(
             prog=self.appname,
-            description=description,
-            formatter_class=RawTextHelpFormatter,
+            description='\n\n'.join(desc),
+            formatter_class=WrappingHelpFormatter,
             add_help=False,
         )
 
@@ -657,81 +624,81 @@ class PostfixLogsumsApp(object):
             'Options for scanning Postfix logfiles'))
 
         # --day
-        desc = self.wrap_msg(_(
-            'Generate report for just today, yesterday or a date in ISO format (YYY-mm-dd).'))
-        desc = self.wrap_msg(desc, arg_width)
+        desc = _(
+            'Generate report for just today, yesterday or a date in ISO format (YYY-mm-dd).')
         logfile_group.add_argument(
             '-d', '--day', metavar=_('DAY'), dest='day',
             action=FilterDayOptionAction, help=desc)
 
         # --extended
-        desc = _('Extended (extreme? excessive?) detail.') + '\n'
-        desc += self.wrap_msg(_(
-            'At present, this includes only a per-message report, sorted by sender domain, '
-            'then user-in-domain, then by queue i.d.'), arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'WARNING: the data built to generate this report can quickly consume very large '
-            'amounts of memory if a lot of log entries are processed!'), arg_width)
+        desc = '\n'.join((
+            _('Extended (extreme? excessive?) detail.'),
+            _(
+                'At present, this includes only a per-message report, sorted by sender '
+                'domain, then user-in-domain, then by queue i.d.'),
+            _(
+                'WARNING: the data built to generate this report can quickly consume very '
+                'large amounts of memory if a lot of log entries are processed!')))
         logfile_group.add_argument(
             '-e', '--extended', dest='extended', action="store_true", help=desc)
 
         # --ignore-case
-        desc = self.wrap_msg(_(
-            'Handle complete email address in a case-insensitive manner.'), arg_width)
-        desc += '\n'
-        desc += self.wrap_msg(_(
-            'Normally {} lower-cases only the host and domain parts, leaving the user part alone. '
-            'This option causes the entire email address to be lower-cased.').format(appname),
-            arg_width)
+        desc = '\n'.join((
+            _('Handle complete email address in a case-insensitive manner.'),
+            _(
+                'Normally {} lower-cases only the host and domain parts, leaving the user part '
+                'alone. This option causes the entire email address to be '
+                'lower-cased.').format(appname)))
         logfile_group.add_argument(
             '-i', '--ignore-case', dest='ignore_case', action="store_true", help=desc)
 
         # --no-no-msg-size
-        desc = self.wrap_msg(_('Do not emit report on "Messages with no size data".'), arg_width)
-        desc += '\n'
-        desc += self.wrap_msg(_(
-            'Message size is reported only by the queue manager. The message may be delivered '
-            'long-enough after the (last) qmgr log entry that the information is not in '
-            'the log(s) processed by a particular run of {a}. This throws off "Recipients by '
-            'message size" and the total for "bytes delivered." These are normally reported by '
-            '{a} as "Messages with nosize data".').format(a=appname), arg_width)
+        desc = '\n'.join((
+            _('Do not emit report on "Messages with no size data".'),
+            _(
+                'Message size is reported only by the queue manager. The message may be '
+                'delivered long-enough after the (last) qmgr log entry that the information is '
+                'not in the log(s) processed by a particular run of {a}. This throws off '
+                '"Recipients by message size" and the total for "bytes delivered." These are '
+                'normally reported by {a} as "Messages with nosize data".').format(a=appname)))
         logfile_group.add_argument(
             '--no-no-msg-size', dest='nono_msgsize', action="store_true", help=desc)
 
         # --rej-add-from
-        desc = self.wrap_msg(_(
+        desc = _(
             'For those reject reports that list IP addresses or host/domain names: append the '
             'email from address to each listing. (Does not apply to "Improper use of '
-            'SMTP command pipelining" report.)'), arg_width)
+            'SMTP command pipelining" report.)')
         logfile_group.add_argument(
             '--rej-add-from', dest='rej_add_from', action="store_true", help=desc)
 
         # --smtpd-stats
-        desc = self.wrap_msg(_('Generate smtpd connection statistics.'), arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'The "per-day" report is not generated for single-day reports. For multiple-day '
-            'reports: "per-hour" numbers are daily averages (reflected in the report '
-            'heading).'), arg_width)
+        desc = '\n'.join((
+            _('Generate smtpd connection statistics.'),
+            _(
+                'The "per-day" report is not generated for single-day reports. For multiple-day '
+                'reports: "per-hour" numbers are daily averages (reflected in the report '
+                'heading).')))
         logfile_group.add_argument(
             '--smtpd-stats', dest='smtpd_stats', action="store_true", help=desc)
 
         # --verp-mung
-        desc = self.wrap_msg(_(
-            'Do "VERP" generated address (?) munging. Convert sender addresses of the form '
-            '"list-return-NN-someuser=some.dom@host.sender.dom" to '
-            '"list-return-ID-someuser=some.dom@host.sender.dom".'), arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'In other words: replace the numeric value with "ID".'), arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'By specifying the optional "=2" (second form), the munging is more "aggressive", '
-            'converting the address to something like: "list-return@host.sender.dom".'),
-            arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'Actually: specifying anything less than 2 does the "simple" munging and anything '
-            'greater than 1 results in the more "aggressive" hack being applied.'), arg_width)
+        desc = '\n'.join((
+            _(
+                'Do "VERP" generated address (?) munging. Convert sender addresses of the form '
+                '"list-return-NN-someuser=some.dom@host.sender.dom" to '
+                '"list-return-ID-someuser=some.dom@host.sender.dom".'),
+            _('In other words: replace the numeric value with "ID".'),
+            _(
+                'By specifying the optional "=2" (second form), the munging is more '
+                '"aggressive", converting the address to something like: '
+                '"list-return@host.sender.dom".'),
+            _(
+                'Actually: specifying anything less than 2 does the "simple" munging and '
+                'anything greater than 1 results in the more "aggressive" hack being applied.')))
         logfile_group.add_argument(
-            '--verp-mung', type=int, metavar='1|2', const=0, dest='verp_mung', nargs='?',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '--verp-mung', type=non_negative_int, metavar='1|2', const=0, dest='verp_mung',
+            nargs='?', help=desc)
 
         #######
         # Select compression
@@ -740,37 +707,34 @@ class PostfixLogsumsApp(object):
         compression_group = compression_section.add_mutually_exclusive_group()
 
         # --gzip
-        desc = self.wrap_msg(_(
-            'Assume, that stdin stream or the given files are gzip compressed.'), arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'If not given, filenames with the extension ".gz" are assumed to be compressed with '
-            'the gzip compression.'), arg_width)
+        desc = '\n'.join((
+            _('Assume, that stdin stream or the given files are gzip compressed.'),
+            _(
+                'If not given, filenames with the extension ".gz" are assumed to be compressed '
+                'with the gzip compression.')))
         compression_group.add_argument(
             '-z', '--gzip', dest='gzip', action="store_true", help=desc)
 
         # --bzip2
-        desc = self.wrap_msg(_(
-            'Assume, that stdin stream or the given files are bzip2 '
-            'compressed.'), arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'If not given, filenames with the extensions ".bz2" or ".bzip2" are assumed to be '
-            'compressed with the bzip2 compression.'), arg_width)
+        desc = '\n'.join((
+            _('Assume, that stdin stream or the given files are bzip2 compressed.'),
+            _(
+                'If not given, filenames with the extensions ".bz2" or ".bzip2" are assumed to '
+                'be compressed with the bzip2 compression.')))
         compression_group.add_argument(
             '-j', '--bzip2', dest='bzip2', action="store_true", help=desc)
 
         # --xz
-        desc = self.wrap_msg(_(
-            'Assume, that stdin stream or the given files are xz or lzma compressed.'),
-            arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'If not given, filenames with the extensions ".xz" or ".lzma" are assumed to be '
-            'compressed with the xz or lzma compression.'), arg_width)
+        desc = '\n'.join((
+            _('Assume, that stdin stream or the given files are xz or lzma compressed.'),
+            _(
+                'If not given, filenames with the extensions ".xz" or ".lzma" are assumed to be '
+                'compressed with the xz or lzma compression.')))
         compression_group.add_argument(
             '-J', '--xz', '--lzma', dest='xz', action="store_true", help=desc)
 
         # last parse option
         desc = _('The logfile(s) to analyze. If no file(s) specified, reads from stdin.')
-        desc = self.wrap_msg(desc, arg_width)
         logfile_group.add_argument(
             'logfiles', metavar=_('FILE'), nargs='*', action=LogFilesOptionAction, help=desc)
 
@@ -778,112 +742,112 @@ class PostfixLogsumsApp(object):
         # Output
         output_options = self.arg_parser.add_argument_group(_('Output options'))
 
-        desc = _('Output format. Valid options are:') + ' ' + format_list(
-            self.output_formats, True) + '. '
-        desc += _("Default: '{}'.").format('txt')
-        desc = self.wrap_msg(desc, arg_width)
+        # Texts used by multiple options, translated only once
+        count_label = _('COUNT')
+        suppress_msg = _('0 to suppress entirely.')
+        none_msg = '0 = {}.'.format(_('none'))
+
+        desc = ' '.join((
+            _('Output format. Valid options are:'),
+            format_list(self.output_formats, True) + '.',
+            _("Default: '{}'.").format('txt')))
         output_options.add_argument(
             '-O', '--output-format', choices=self.output_formats, metavar=_('FORMAT'),
             dest='output_format', help=desc)
 
         # --detail
-        desc = self.wrap_msg(_(
-            'Sets all --*-detail, -h and -u to COUNT. Is over-ridden by '
-            'individual settings.'), arg_width) + '\n'
-        desc += self.wrap_msg(_('--detail 0 suppresses *all* detail.'), arg_width)
+        desc = '\n'.join((
+            _('Sets all --*-detail, -h and -u to COUNT. Is over-ridden by individual settings.'),
+            _('--detail 0 suppresses *all* detail.')))
         output_options.add_argument(
-            '-D', '--detail', type=int, metavar=_('COUNT'), dest='detail',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '-D', '--detail', type=non_negative_int, metavar=count_label, dest='detail',
+            help=desc)
 
         # --bounce-detail
-        desc = self.wrap_msg(_(
-            'Limit detailed bounce reports to the top {}.').format(_('COUNT')), arg_width) + '\n'
-        desc += self.wrap_msg(_('0 to suppress entirely.'), arg_width)
+        desc = '\n'.join((
+            _('Limit detailed bounce reports to the top {}.').format(count_label),
+            suppress_msg))
         output_options.add_argument(
-            '--bounce-detail', type=int, metavar=_('COUNT'), dest='detail_bounce',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '--bounce-detail', type=non_negative_int, metavar=count_label, dest='detail_bounce',
+            help=desc)
 
         # --deferral-detail
-        desc = self.wrap_msg(_(
-            'Limit detailed deferral reports to the top {}.').format(_('COUNT')), arg_width) + '\n'
-        desc += self.wrap_msg(_('0 to suppress entirely.'), arg_width)
+        desc = '\n'.join((
+            _('Limit detailed deferral reports to the top {}.').format(count_label),
+            suppress_msg))
         output_options.add_argument(
-            '--deferral-detail', type=int, metavar=_('COUNT'), dest='detail_deferral',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '--deferral-detail', type=non_negative_int, metavar=count_label,
+            dest='detail_deferral', help=desc)
 
         # --reject-detail
-        desc = self.wrap_msg(_(
-            'Limit detailed smtpd reject, warn, hold and discard reports to the '
-            'top {}.').format(_('COUNT')), arg_width) + '\n'
-        desc += self.wrap_msg(_('0 to suppress entirely.'), arg_width)
+        desc = '\n'.join((
+            _(
+                'Limit detailed smtpd reject, warn, hold and discard reports to the '
+                'top {}.').format(count_label),
+            suppress_msg))
         output_options.add_argument(
-            '--reject-detail', type=int, metavar=_('COUNT'), dest='detail_reject',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '--reject-detail', type=non_negative_int, metavar=count_label, dest='detail_reject',
+            help=desc)
 
         # --smtp-detail
-        desc = self.wrap_msg(_(
-            'Limit detailed smtp delivery reports to the '
-            'top {}.').format(_('COUNT')), arg_width) + '\n'
-        desc += self.wrap_msg(_('0 to suppress entirely.'), arg_width)
+        desc = '\n'.join((
+            _('Limit detailed smtp delivery reports to the top {}.').format(count_label),
+            suppress_msg))
         output_options.add_argument(
-            '--smtp-detail', type=int, metavar=_('COUNT'), dest='detail_smtp',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '--smtp-detail', type=non_negative_int, metavar=count_label, dest='detail_smtp',
+            help=desc)
 
         # --smtpd-warning-detail
-        desc = self.wrap_msg(_(
-            'Limit detailed smtpd warnings reports to the '
-            'top {}.').format(_('COUNT')), arg_width) + '\n'
-        desc += self.wrap_msg(_('0 to suppress entirely.'), arg_width)
+        desc = '\n'.join((
+            _('Limit detailed smtpd warnings reports to the top {}.').format(count_label),
+            suppress_msg))
         output_options.add_argument(
-            '--smtpd-warning-detail', type=int, metavar=_('COUNT'), dest='detail_smtpd_warning',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '--smtpd-warning-detail', type=non_negative_int, metavar=count_label,
+            dest='detail_smtpd_warning', help=desc)
 
         # --host
-        desc = self.wrap_msg(_(
-            'Top {} to display in host/domain reports.').format(_('COUNT')), arg_width)
-        desc += '\n0 = {}.\n'.format(_('none'))
-        desc += self.wrap_msg(_(
-            'See also: "-u" and "--*-detail" options for further report-limiting options.'),
-            arg_width)
+        desc = '\n'.join((
+            _('Top {} to display in host/domain reports.').format(count_label),
+            none_msg,
+            _('See also: "-u" and "--*-detail" options for further report-limiting options.')))
         output_options.add_argument(
-            '-h', '--host', type=int, metavar=_('COUNT'), dest='detail_host',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '-h', '--host', type=non_negative_int, metavar=count_label, dest='detail_host',
+            help=desc)
 
         # --user
-        desc = self.wrap_msg(_(
-            'Top {} to display in user reports.').format(_('COUNT')), arg_width) + '\n'
-        desc += '0 = {}.'.format(_('none'))
+        desc = '\n'.join((
+            _('Top {} to display in user reports.').format(count_label),
+            none_msg))
         output_options.add_argument(
-            '-u', '--user', type=int, metavar=_('COUNT'), dest='detail_user',
-            action=NonNegativeItegerOptionAction, help=desc)
+            '-u', '--user', type=non_negative_int, metavar=count_label, dest='detail_user',
+            help=desc)
 
         # --problems-first
-        desc = self.wrap_msg(_(
-            'Emit "problems" reports (bounces, defers, warnings, etc.) before "normal" stats.'),
-            arg_width)
+        desc = _(
+            'Emit "problems" reports (bounces, defers, warnings, etc.) before "normal" stats.')
         output_options.add_argument(
             '--pf', '--problems-first', dest='problems_first', action="store_true", help=desc)
 
         # --iso-date-time
-        desc = self.wrap_msg(_(
+        desc = _(
             'For summaries that contain date or time information, use ISO 8601 standard formats '
-            '(CCYY-MM-DD and HH:MM), rather than "Mon DD CCYY" and "HHMM".'), arg_width)
+            '(CCYY-MM-DD and HH:MM), rather than "Mon DD CCYY" and "HHMM".')
         output_options.add_argument(
             '--iso-date-time', dest='iso_date', action="store_true", help=desc)
 
         # --verbose-msg-detail
-        desc = self.wrap_msg(_(
-            'For the message deferral, bounce and reject summaries: display the full "reason", '
-            'rather than a truncated one.'), arg_width) + '\n'
-        desc += self.wrap_msg(_(
-            'NOTE: this can result in quite long lines in the report.'), arg_width)
+        desc = '\n'.join((
+            _(
+                'For the message deferral, bounce and reject summaries: display the full '
+                '"reason", rather than a truncated one.'),
+            _('NOTE: this can result in quite long lines in the report.')))
         output_options.add_argument(
             '--verbose-msg-detail', dest='detail_verbose_msg', action="store_true", help=desc)
 
         # --zero-fill
-        desc = self.wrap_msg(_(
+        desc = _(
             '"Zero-fill" certain arrays so reports come out with data in columns that might '
-            'otherwise be blank.'), arg_width)
+            'otherwise be blank.')
         output_options.add_argument(
             '--zero-fill', dest='zero_fill', action="store_true", help=desc)
 
@@ -893,17 +857,17 @@ class PostfixLogsumsApp(object):
 
         verbose_group = general_group.add_mutually_exclusive_group()
 
-        desc = self.wrap_msg(_(
-            'Enabling debug messages and increase their verbosity level if used multiple times.'))
+        desc = _(
+            'Enabling debug messages and increase their verbosity level if used multiple times.')
         verbose_group.add_argument(
             "-v", "--verbose", action="count", dest='verbose', help=desc)
 
         # --quiet
-        desc = self.wrap_msg(_("quiet - don't print headings for empty reports."), arg_width)
-        desc += '\n'
-        desc += self.wrap_msg(_(
-            'NOTE: headings for warning, fatal, and "master" messages will always be '
-            'printed.'), arg_width)
+        desc = '\n'.join((
+            _("quiet - don't print headings for empty reports."),
+            _(
+                'NOTE: headings for warning, fatal, and "master" messages will always be '
+                'printed.')))
         verbose_group.add_argument(
             '-q', '--quiet', dest='quiet', action="store_true", help=desc)
 
@@ -926,15 +890,19 @@ class PostfixLogsumsApp(object):
     # -------------------------------------------------------------------------
     def perform_arg_parser(self):
 
-        self.args = self.arg_parser.parse_args()
+        args = self.arg_parser.parse_args()
+        self.args = args
 
-        if self.args.usage:
+        if args.usage:
             self.arg_parser.print_usage(sys.stdout)
-            self.exit(0)
+            self.arg_parser.exit(0)
+
+        # The value of --detail doesn't change anymore after parsing.
+        self._detail = args.detail
 
-        if self.args.verbose is not None and self.args.verbose > self.verbose:
-            self.verbose = self.args.verbose
-        elif self.args.quiet:
+        if args.verbose is not None and args.verbose > self.verbose:
+            self.verbose = args.verbose
+        elif args.quiet:
             self.quiet = True
 
     # -------------------------------------------------------------------------
@@ -955,31 +923,56 @@ class PostfixLogsumsApp(object):
         root_logger.setLevel(log_level)
 
         # create formatter
-        format_str = ''
-        if self.verbose:
-            format_str = '[%(asctime)s]: '
-        format_str += self.appname + ': '
-        if self.verbose:
-            if self.verbose > 1:
-                format_str += '%(name)s(%(lineno)d) %(funcName)s() '
-            else:
-                format_str += '%(name)s '
-        format_str += '%(levelname)s - %(message)s'
-        formatter = logging.Formatter(format_str)
+        format_str = self.log_formats[min(self.verbose, 2)]
+        formatter = logging.Formatter(format_str.format(appname=self.appname))
+
+        # create log handler for console output, or reuse it on a repeated call
+        lh_console = None
+        for handler in root_logger.handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stderr:
+                lh_console = handler
+                break
+        if lh_console is None:
+            lh_console = logging.StreamHandler(sys.stderr)
+            root_logger.addHandler(lh_console)
 
-        # create log handler for console output
-        lh_console = logging.StreamHandler(sys.stderr)
         lh_console.setLevel(log_level)
         lh_console.setFormatter(formatter)
 
-        root_logger.addHandler(lh_console)
-
         return
 
+    # -------------------------------------------------------------------------
+    def init_parser(self):
+        """Create the parser object for the Postfix logfiles.
+
+        It is called not before run(), so the regular expressions of the parser
+        are not compiled, if the application exits earlier.
+        """
+        args = self.args
+
+        compression = None
+        if args.gzip:
+            compression = 'gzip'
+        elif args.bzip2:
+            compression = 'bzip2'
+        elif args.xz:
+            compression = 'lzma'
+
+        self.parser = PostfixLogParser(
+            appname=self.appname, verbose=self.verbose, day=args.day,
+            compression=compression, zero_fill=args.zero_fill, detail_smtp=self.detail_smtp,
+            detail_reject=self.detail_reject, detail_smtpd_warning=self.detail_smtpd_warning,
+            detail_bounce=self.detail_bounce, detail_deferral=self.detail_deferral,
+            ignore_case=args.ignore_case, rej_add_from=args.rej_add_from,
+            smtpd_stats=args.smtpd_stats, extended=args.extended,
+            verp_mung=args.verp_mung, detail_verbose_msg=self.detail_verbose_msg)
+
     # -------------------------------------------------------------------------
     def handle_error(
             self, error_message=None, exception_name=None, do_traceback=False):
 
+        import traceback
+
         msg = str(error_message).strip()
         if not msg:
             msg = _('undefined error.')
@@ -1001,7 +994,7 @@ class PostfixLogsumsApp(object):
 
         if has_handlers:
             LOG.error(msg)
-            if do_traceback:
+            if do_traceback and LOG.isEnabledFor(logging.ERROR):
                 LOG.error(traceback.format_exc())
         else:
             curdate = datetime.datetime.now()
@@ -1027,9 +1020,11 @@ class PostfixLogsumsApp(object):
 
         locale.setlocale(locale.LC_ALL, '')
 
+        if not self.parser:
+            self.init_parser()
         self.parser.parse(*self.args.logfiles)
         self.results = self.parser.results
-        self.nr_days = len(self.results.messages_per_day.keys())
+        self.nr_days = len(self.results.messages_per_day)
 
         if self.verbose > 2:
             LOG.info(_('Result of parsing:') + '\n' + pp(self.results.as_dict()))
@@ -1040,18 +1035,34 @@ class PostfixLogsumsApp(object):
             print(json.dumps(self.results.dict(), indent=4, sort_keys=True))
             return
         elif self.args.output_format == 'yaml':
+            import yaml
             print(yaml.safe_dump(
                 self.results.dict(), allow_unicode=True, explicit_start=True, canonical=False,
                 sort_keys=True, indent=4, width=self.max_width, default_style=None))
             return
 
+        # On a terminal stdout is line buffered. The report is written
+        # in big blocks instead and flushed at the end.
+        line_buffering = getattr(sys.stdout, 'line_buffering', False)
+        if line_buffering and hasattr(sys.stdout, 'reconfigure'):
+            sys.stdout.reconfigure(line_buffering=False)
+            try:
+                self.print_report()
+            finally:
+                sys.stdout.reconfigure(line_buffering=True)
+        else:
+            self.print_report()
+
+    # -------------------------------------------------------------------------
+    def print_report(self):
+        """Print the complete report as text."""
         print()
         if self.parser.date_str:
             msg = _("Postfix log summaries for {}").format(self.parser.date_str)
         else:
             msg = _("Postfix log summaries")
         print(msg)
-        print('=' * len(msg))
+        print(underline(len(msg), '='))
 
         self.print_grand_totals()
 
@@ -1094,19 +1105,20 @@ class PostfixLogsumsApp(object):
     def print_grand_totals(self):
         """Printing the grand total numbers and data."""
         self.print_subsect_title(_('Grand Totals'))
+        results = self.results
 
-        if self.results.logdate_oldest or self.results.logdate_latest:
+        if results.logdate_oldest or results.logdate_latest:
             lbl_oldest = _('Date of oldest log entry:')
             lbl_latest = _('Date of latest log entry:')
             max_len = len(lbl_oldest)
             if len(lbl_latest) > max_len:
                 max_len = len(lbl_latest)
             print()
-            if self.results.logdate_oldest:
-                dt = self.results.logdate_oldest.isoformat(' ')
+            if results.logdate_oldest:
+                dt = results.logdate_oldest.isoformat(' ')
                 print("{m:<{lng}}  {dt}".format(m=lbl_oldest, lng=max_len, dt=dt))
-            if self.results.logdate_latest:
-                dt = self.results.logdate_latest.isoformat(' ')
+            if results.logdate_latest:
+                dt = results.logdate_latest.isoformat(' ')
                 print("{m:<{lng}}  {dt}".format(m=lbl_latest, lng=max_len, dt=dt))
 
         print()
@@ -1126,11 +1138,12 @@ class PostfixLogsumsApp(object):
         #  - self.results.messages['discard'] => self.results.msgs_total.discarded
 
         tpl_loc = ' {val:>8}  {lbl}'
+        totals = results.msgs_total
 
-        msgs_received = self.results.msgs_total.received
-        msgs_delivered = self.results.msgs_total.delivered
-        msgs_rejected = self.results.msgs_total.rejected
-        msgs_discarded = self.results.msgs_total.discarded
+        msgs_received = totals.received
+        msgs_delivered = totals.delivered
+        msgs_rejected = totals.rejected
+        msgs_discarded = totals.discarded
         msgs_total = msgs_delivered + msgs_rejected + msgs_discarded
 
         msgs_rejected_pct = 0.0
@@ -1139,47 +1152,49 @@ class PostfixLogsumsApp(object):
             msgs_rejected_pct = msgs_rejected / msgs_total * 100
             msgs_discarded_pct = msgs_discarded / msgs_total * 100
 
+        # All lines are collected and printed at once.
+        lines = []
+
         nr = adj_int_units_localized(msgs_received)
-        print(tpl_loc.format(val=nr, lbl=_('received')))
+        lines.append(tpl_loc.format(val=nr, lbl=_('received')))
         nr = adj_int_units_localized(msgs_delivered)
-        print(tpl_loc.format(val=nr, lbl=_('delivered')))
-        nr = adj_int_units_localized(self.results.msgs_total.forwarded)
-        print(tpl_loc.format(val=nr, lbl=_('forwarded')))
-        nr = adj_int_units_localized(self.results.msgs_total.deferred)
-        print(tpl_loc.format(val=nr, lbl=_('deferred')), end='')
-        if self.results.msgs_total.deferrals:
-            nr = adj_int_units_localized(self.results.msgs_total.deferrals)
-            val = '  ({val} {lbl})'.format(lbl=_('deferrals'), val=nr)
-            print(val, end='')
-        print()
-        nr = adj_int_units_localized(self.results.msgs_total.bounced)
-        print(tpl_loc.format(val=nr, lbl=_('bounced')))
-        nr = adj_int_units_localized(self.results.msgs_total.rejected)
-        print(tpl_loc.format(val=nr, lbl=_('rejected')), end='')
-        print(' ({:0.1f}%)'.format(msgs_rejected_pct))
-        nr = adj_int_units_localized(self.results.msgs_total.reject_warning)
-        print(tpl_loc.format(val=nr, lbl=_('reject warnings')))
-        nr = adj_int_units_localized(self.results.msgs_total.held)
-        print(tpl_loc.format(val=nr, lbl=_('held')))
-        nr = adj_int_units_localized(self.results.msgs_total.discarded)
-        print(tpl_loc.format(val=nr, lbl=_('discarded')), end='')
-        print(' ({:0.1f}%)'.format(msgs_discarded_pct))
-        print()
-
-        nr = adj_int_units_localized(self.results.msgs_total.bytes_received)
-        print(tpl_loc.format(val=nr, lbl=_('bytes received')))
-        nr = adj_int_units_localized(self.results.msgs_total.bytes_delivered)
-        print(tpl_loc.format(val=nr, lbl=_('bytes delivered')))
-        nr = adj_int_units_localized(self.results.msgs_total.sending_users)
-        print(tpl_loc.format(val=nr, lbl=_('senders')))
-        nr = adj_int_units_localized(self.results.msgs_total.sending_domains)
-        print(tpl_loc.format(val=nr, lbl=_('sending hosts/domains')))
-        nr = adj_int_units_localized(self.results.msgs_total.rcpt_users)
-        print(tpl_loc.format(val=nr, lbl=_('recipients')))
-        nr = adj_int_units_localized(self.results.msgs_total.rcpt_domains)
-        print(tpl_loc.format(val=nr, lbl=_('recipients hosts/domains')))
-
-        print()
+        lines.append(tpl_loc.format(val=nr, lbl=_('delivered')))
+        nr = adj_int_units_localized(totals.forwarded)
+        lines.append(tpl_loc.format(val=nr, lbl=_('forwarded')))
+        nr = adj_int_units_localized(totals.deferred)
+        lines.append(tpl_loc.format(val=nr, lbl=_('deferred')))
+        if totals.deferrals:
+            nr = adj_int_units_localized(totals.deferrals)
+            lines[-1] += '  ({val} {lbl})'.format(lbl=_('deferrals'), val=nr)
+        nr = adj_int_units_localized(totals.bounced)
+        lines.append(tpl_loc.format(val=nr, lbl=_('bounced')))
+        nr = adj_int_units_localized(msgs_rejected)
+        lines.append(tpl_loc.format(val=nr, lbl=_('rejected')))
+        lines[-1] += ' ({:0.1f}%)'.format(msgs_rejected_pct)
+        nr = adj_int_units_localized(totals.reject_warning)
+        lines.append(tpl_loc.format(val=nr, lbl=_('reject warnings')))
+        nr = adj_int_units_localized(totals.held)
+        lines.append(tpl_loc.format(val=nr, lbl=_('held')))
+        nr = adj_int_units_localized(msgs_discarded)
+        lines.append(tpl_loc.format(val=nr, lbl=_('discarded')))
+        lines[-1] += ' ({:0.1f}%)'.format(msgs_discarded_pct)
+        lines.append('')
+
+        nr = adj_int_units_localized(totals.bytes_received)
+        lines.append(tpl_loc.format(val=nr, lbl=_('bytes received')))
+        nr = adj_int_units_localized(totals.bytes_delivered)
+        lines.append(tpl_loc.format(val=nr, lbl=_('bytes delivered')))
+        nr = adj_int_units_localized(totals.sending_users)
+        lines.append(tpl_loc.format(val=nr, lbl=_('senders')))
+        nr = adj_int_units_localized(totals.sending_domains)
+        lines.append(tpl_loc.format(val=nr, lbl=_('sending hosts/domains')))
+        nr = adj_int_units_localized(totals.rcpt_users)
+        lines.append(tpl_loc.format(val=nr, lbl=_('recipients')))
+        nr = adj_int_units_localized(totals.rcpt_domains)
+        lines.append(tpl_loc.format(val=nr, lbl=_('recipients hosts/domains')))
+        lines.append('')
+
+        print('\n'.join(lines))
 
     # -------------------------------------------------------------------------
     def print_subsect_title(self, title, nr_items=1, count=None, quiet=None):
@@ -1199,7 +1214,7 @@ class PostfixLogsumsApp(object):
             msg += ' ({lbl}: {c})'.format(lbl=_('top'), c=count)
 
         print(msg)
-        print('-' * len(msg))
+        print(underline(len(msg)))
 
         return True
 
@@ -1207,66 +1222,78 @@ class PostfixLogsumsApp(object):
     def print_smtpd_stats(self):
 
         tpl_loc = ' {val:>8}  {lbl}'
-        count_domains = len(self.results.smtpd_per_domain.keys())
-        total_conn = self.results.msgs_total.connections
-        time_conn = self.results.connections_time
+        results = self.results
+        count_domains = len(results.smtpd_per_domain)
+        total_conn = results.msgs_total.connections
+        time_conn = results.connections_time
         avg_time = 0.0
         if total_conn:
             avg_time = (time_conn / total_conn) + 0.5
         total_time_splitted = get_smh(time_conn)
 
-        print()
-        print('Smtpd:')
-        print()
-
-        print(tpl_loc.format(val=adj_int_units_localized(total_conn), lbl=_('connections')))
-        print(tpl_loc.format(val=adj_int_units_localized(count_domains), lbl=_('hosts/domains')))
-        print(tpl_loc.format(
+        lines = ['', 'Smtpd:', '']
+        lines.append(tpl_loc.format(
+            val=adj_int_units_localized(total_conn), lbl=_('connections')))
+        lines.append(tpl_loc.format(
+            val=adj_int_units_localized(count_domains), lbl=_('hosts/domains')))
+        lines.append(tpl_loc.format(
             val=adj_int_units_localized(avg_time, no_unit=True), lbl=_('connections')))
-        print('  {h:d}:{m:02d}:{s:02.0f}  {lbl}'.format(
+        lines.append('  {h:d}:{m:02d}:{s:02.0f}  {lbl}'.format(
             h=total_time_splitted[2], m=total_time_splitted[1],
             s=total_time_splitted[0], lbl=_('total connect time')))
-        print()
+        lines.append('')
+
+        print('\n'.join(lines))
 
     # -------------------------------------------------------------------------
     def print_nested_hash(self, data, label, count):
-        if not len(data.keys()):
+        if not data:
             if self.quiet:
                 return
             print('\n{lbl}: {n}'.format(lbl=label, n=_('none')))
             return
         print('\n{lbl}'.format(lbl=label))
-        print('-' * len(label))
+        print(underline(len(label)))
         self.walk_nested_hash(data, count)
 
     # -------------------------------------------------------------------------
     def walk_nested_hash(self, data, count, level=0):
         """# 'walk' a 'nested' hash"""
-        if not len(data.keys()):
-            return
-        level += 1
-        indent = '  ' * level
-        sorted_keys = sorted(data.keys(), key=str.lower)
-        first_key = sorted_keys[0]
-        first_value = data[first_key]
+        # A stack of the headings to print before the dicts to walk through,
+        # so the keys of every dict are sorted only once.
+        stack = [(None, data, level)]
+        while stack:
+            heading, data, level = stack.pop()
+            if heading is not None:
+                print(heading)
+            if not data:
+                continue
+            level += 1
+            indent = '  ' * level
+            sorted_keys = sorted(data.keys(), key=str.casefold)
+            first_key = sorted_keys[0]
+            first_value = data[first_key]
+
+            if type(first_value) is not dict:
+                self.really_print_hash_by_cnt_vals(data, count, indent)
+                continue
 
-        if isinstance(first_value, dict):
+            children = []
             for key in sorted_keys:
-                print('{i}{k}'.format(i=indent, k=key), end='')
-                first_key2 = sorted(data[key].keys(), key=str.lower)[0]
-                first_value2 = data[key][first_key2]
-                if not isinstance(first_value2, dict):
+                heading = indent + key
+                sub_data = data[key]
+                # All values of a nested dict have the same type, so any value tells it.
+                first_value2 = next(iter(sub_data.values()))
+                if type(first_value2) is not dict:
                     if count is not None and count > 0:
-                        print(' ({lbl}: {c})'.format(lbl=_('top'), c=count), end='')
-                    total_count = 0
-                    for key2 in data[key].keys():
-                        total_count += data[key][key2]
+                        heading += ' ({lbl}: {c})'.format(lbl=_('top'), c=count)
+                    total_count = sum(sub_data.values())
                     val = adj_int_units_localized(total_count, no_unit=True).rstrip()
-                    print(' ({lbl}: {c})'.format(lbl=_('total'), c=val), end='')
-                print()
-                self.walk_nested_hash(data[key], count, level)
-        else:
-            self.really_print_hash_by_cnt_vals(data, count, indent)
+                    heading += ' ({lbl}: {c})'.format(lbl=_('total'), c=val)
+                children.append((heading, sub_data, level))
+
+            # The last pushed dict is walked first.
+            stack.extend(reversed(children))
 
     # -------------------------------------------------------------------------
     def print_hash_by_cnt_vals(self, data, title, count):
@@ -1274,14 +1301,14 @@ class PostfixLogsumsApp(object):
         order (i.e.: highest first)."""
         if count:
             title = "{top} {c} ".format(top="top", c=count) + title
-        if not len(data.keys()):
+        if not data:
             if self.quiet:
                 return
             print('\n{lbl}: {n}'.format(lbl=title, n=_('none')))
             return
 
         print('\n{lbl}'.format(lbl=title))
-        print('-' * len(title))
+        print(underline(len(title)))
 
         self.really_print_hash_by_cnt_vals(data, count, ' ')
 
@@ -1291,14 +1318,14 @@ class PostfixLogsumsApp(object):
         order (i.e.: highest first), then by IP/addr, in ascending order."""
         tpl = '{i}{val:>8}  {lbl}'
 
-        i = 0
-        for key in self.sorted_keys_by_count_and_key(data):
-            val = adj_int_units_localized(data[key])
+        # Even a count of 0 prints the first entry.
+        limit = None
+        if count is not None:
+            limit = max(count, 1)
+
+        for key, value in self.sorted_items_by_count_and_key(data, limit):
+            val = adj_int_units_localized(value)
             print(tpl.format(i=indent, lbl=key, val=val))
-            if count is not None:
-                i += 1
-                if i >= count:
-                    break
 
     # -------------------------------------------------------------------------
     def print_hash_by_key(self, data, title, count=None, quiet=None):
@@ -1307,7 +1334,7 @@ class PostfixLogsumsApp(object):
             quiet = self.quiet
         indent = '  '
 
-        nr_items = len(data.keys())
+        nr_items = len(data)
         if not self.print_subsect_title(title, nr_items=nr_items, count=count):
             return
 
@@ -1399,27 +1426,33 @@ class PostfixLogsumsApp(object):
 
         header = tpl.format(**labels)
         print(indent + header)
-        print(indent + ('-' * len(header)))
+        print(indent + underline(len(header)))
 
-        for day in self.results.messages_per_day.keys():
-
-            stats = {}
-            if self.args.iso_date:
-                stats['date'] = day.isoformat()
+        # ---------------------------------------------
+        def fmt(value):
+            return adj_int_units_localized(value, no_unit=True).rstrip()
+
+        w_date = widths['date']
+        w_received = widths['received']
+        w_sent = widths['sent']
+        w_deferred = widths['deferred']
+        w_bounced = widths['bounced']
+        w_rejected = widths['rejected']
+
+        iso_date = self.args.iso_date
+        lines = []
+        for day, stats in self.results.messages_per_day.items():
+            if iso_date:
+                date = day.isoformat()
             else:
-                stats['date'] = day.strftime('%b %d %Y')
-            stats['received'] = adj_int_units_localized(
-                self.results.messages_per_day[day].received, no_unit=True).rstrip()
-            stats['sent'] = adj_int_units_localized(
-                self.results.messages_per_day[day].sent, no_unit=True).rstrip()
-            stats['deferred'] = adj_int_units_localized(
-                self.results.messages_per_day[day].deferred, no_unit=True).rstrip()
-            stats['bounced'] = adj_int_units_localized(
-                self.results.messages_per_day[day].bounced, no_unit=True).rstrip()
-            stats['rejected'] = adj_int_units_localized(
-                self.results.messages_per_day[day].rejected, no_unit=True).rstrip()
-            line = tpl.format(**stats)
-            print(indent + line)
+                date = day.strftime('%b %d %Y')
+            lines.append(
+                f'{indent}{date:<{w_date}}  {fmt(stats.received):>{w_received}}  '
+                f'{fmt(stats.sent):>{w_sent}}  {fmt(stats.deferred):>{w_deferred}}  '
+                f'{fmt(stats.bounced):>{w_bounced}}  {fmt(stats.rejected):>{w_rejected}}')
+
+        if lines:
+            print('\n'.join(lines))
 
     # -------------------------------------------------------------------------
     def print_per_hour_summary(self):
@@ -1464,16 +1497,17 @@ class PostfixLogsumsApp(object):
 
         header = tpl.format(**labels)
         print(indent + header)
-        print(indent + ('-' * len(header)))
+        print(indent + underline(len(header)))
+
+        hour_tpl = '{:>02d}00 - {:>02d}00'
+        if self.args.iso_date:
+            hour_tpl = '{:>02d}:00 - {:>02d}:00'
 
         for hour in range(self.hours_per_day):
             next_hour = hour + 1
             if next_hour >= self.hours_per_day:
                 next_hour = 0
-            if self.args.iso_date:
-                hour_show = '{:>02d}:00 - {:>02d}:00'.format(hour, next_hour)
-            else:
-                hour_show = '{:>02d}00 - {:>02d}00'.format(hour, next_hour)
+            hour_show = hour_tpl.format(hour, next_hour)
             values = {
                 'hour': hour_show,
                 'received': 0,
@@ -1525,7 +1559,7 @@ class PostfixLogsumsApp(object):
             return
 
         title = _('Host/Domain Summary: Message Delivery')
-        nr_items = len(self.results.rcpt_domain.keys())
+        nr_items = len(self.results.rcpt_domain)
         if not self.print_subsect_title(title, nr_items=nr_items, count=count):
             return
 
@@ -1560,7 +1594,7 @@ class PostfixLogsumsApp(object):
 
         header = tpl.format(**labels)
         print(indent + header)
-        print(indent + ('-' * len(header)))
+        print(indent + underline(len(header)))
 
         i = 0
         for domain in self.sorted_keys_of_msg_stats(self.results.rcpt_domain):
@@ -1595,7 +1629,7 @@ class PostfixLogsumsApp(object):
             return
 
         title = _('Host/Domain Summary: Messages Received')
-        nr_items = len(self.results.sending_domain_data.keys())
+        nr_items = len(self.results.sending_domain_data)
         if not self.print_subsect_title(title, nr_items=nr_items, count=count):
             return
 
@@ -1621,7 +1655,7 @@ class PostfixLogsumsApp(object):
 
         header = tpl.format(**labels)
         print(indent + header)
-        print(indent + ('-' * len(header)))
+        print(indent + underline(len(header)))
 
         i = 0
         for domain in self.sorted_keys_of_msg_stats(self.results.sending_domain_data):
@@ -1645,7 +1679,7 @@ class PostfixLogsumsApp(object):
         title = _('Per-Day SMTPD Connection Summary')
         indent = '  '
 
-        nr_items = len(self.results.smtpd_per_day.keys())
+        nr_items = len(self.results.smtpd_per_day)
         if not self.print_subsect_title(title, nr_items=nr_items):
             return
 
@@ -1677,8 +1711,9 @@ class PostfixLogsumsApp(object):
 
         header = tpl.format(**labels)
         print(indent + header)
-        print(indent + ('-' * len(header)))
+        print(indent + underline(len(header)))
 
+        iso_date = self.args.iso_date
         for day in self.results.smtpd_per_day.keys():
 
             stats = self.results.smtpd_per_day[day]
@@ -1690,7 +1725,7 @@ class PostfixLogsumsApp(object):
                 avg = stats.connect_time_total / stats.connections
 
             values = {}
-            if self.args.iso_date:
+            if iso_date:
                 values['date'] = day.isoformat()
             else:
                 values['date'] = day.strftime('%b %d %Y')
@@ -1750,7 +1785,11 @@ class PostfixLogsumsApp(object):
 
         header = tpl.format(**labels)
         print(indent + header)
-        print(indent + ('-' * len(header)))
+        print(indent + underline(len(header)))
+
+        hour_tpl = '{:>02d}00 - {:>02d}00'
+        if self.args.iso_date:
+            hour_tpl = '{:>02d}:00 - {:>02d}:00'
 
         hour = -1
         for stat in self.results.smtpd_messages_per_hour:
@@ -1763,10 +1802,7 @@ class PostfixLogsumsApp(object):
             next_hour = hour + 1
             if next_hour >= self.hours_per_day:
                 next_hour = 0
-            if self.args.iso_date:
-                hour_show = '{:>02d}:00 - {:>02d}:00'.format(hour, next_hour)
-            else:
-                hour_show = '{:>02d}00 - {:>02d}00'.format(hour, next_hour)
+            hour_show = hour_tpl.format(hour, next_hour)
             values = {
                 'hour': hour_show,
                 'conn': 0,
@@ -1803,7 +1839,7 @@ class PostfixLogsumsApp(object):
             return
 
         title = _('Host/Domain Summary: SMTPD Connections')
-        nr_items = len(self.results.smtpd_per_domain.keys())
+        nr_items = len(self.results.smtpd_per_domain)
         if not self.print_subsect_title(title, nr_items=nr_items, count=count):
             return
 
@@ -1836,7 +1872,7 @@ class PostfixLogsumsApp(object):
 
         header = tpl.format(**labels)
         print(indent + header)
-        print(indent + ('-' * len(header)))
+        print(indent + underline(len(header)))
 
         i = 0
         for domain in self.sorted_keys_of_smtpd_stats(self.results.smtpd_per_domain):
@@ -1880,28 +1916,20 @@ class PostfixLogsumsApp(object):
         indent = '  '
         count = self.detail_user
 
-        nr_items = len(data.keys())
+        nr_items = len(data)
         if not self.print_subsect_title(title, nr_items=nr_items, count=count):
             return
 
-        tmp_list = []
-        for addr in data.keys():
-            data_point = data[addr].dict()
-            data_point['addr'] = addr
-            tmp_list.append(data_point)
-
-        tmp_list.sort(key=itemgetter('addr'))
-        tmp_list.sort(key=itemgetter(attribute), reverse=True)
+        # Sorted by the value descending, then by the address.
+        tmp_list = [(getattr(stats, attribute), addr) for addr, stats in data.items()]
+        tmp_list.sort(key=lambda item: (-item[0], item[1]))
 
         if self.verbose > 3:
             LOG.debug("Sorted list:\n" + pp(tmp_list))
 
         i = 0
         tpl = '{val:>9}  {addr}'
-        for data_point in tmp_list:
-            addr = data_point['addr']
-            value = data_point[attribute]
-
+        for value, addr in tmp_list:
             line = tpl.format(val=adj_int_units_localized(value), addr=addr)
             print(indent + line)
 
@@ -1916,7 +1944,7 @@ class PostfixLogsumsApp(object):
         title = "Message detail"
 
         data = self.results.message_details
-        if not self.print_subsect_title(title, nr_items=len(data.keys())):
+        if not self.print_subsect_title(title, nr_items=len(data)):
             return
 
         max_len = 1
@@ -1924,50 +1952,17 @@ class PostfixLogsumsApp(object):
             if len(key) > max_len:
                 max_len = len(key)
 
-        def by_domain_then_user(qid_one, qid_two):
-            list_one = data[qid_one]
-            list_two = data[qid_two]
-
-            user_one = None
-            domain_one = None
-            user_two = None
-            domain_two = None
-
-            parts = self.re_mailsplit.split(list_one[0])
-            user_one = parts[0]
-            if len(parts) > 1:
-                domain_one = parts[1]
-
-            parts = self.re_mailsplit.split(list_two[0])
-            user_two = parts[0]
-            if len(parts) > 1:
-                domain_two = parts[1]
-
-            if domain_one:
-                domain_one = self.re_maildomain.sub(r'\2.\3.\1', domain_one)
-            else:
-                domain_one = ''
-
-            if domain_two:
-                domain_two = self.re_maildomain.sub(r'\2.\3.\1', domain_two)
-            else:
-                domain_two = ''
-
-            ret = ci_cmp(domain_one, domain_two)
-            if ret:
-                return ret
-
-            user_one = self.re_bang_path.sub('', user_one)
-            user_two = self.re_bang_path.sub('', user_two)
-
-            ret = ci_cmp(user_one, user_two)
-            if ret:
-                return ret
-
-            return ci_cmp(qid_one, qid_two)
+        # Sorted case insensitive, names differing only in case by their exact spelling.
+        def by_domain_then_user(qid):
+            parts = self.re_mailsplit.split(data[qid][0])
+            user = self.re_bang_path.sub('', parts[0])
+            domain = ''
+            if len(parts) > 1 and parts[1]:
+                domain = self.re_maildomain.sub(r'\2.\3.\1', parts[1])
+            return (domain.casefold(), domain, user.casefold(), user, qid.casefold(), qid)
 
         tpl = indent + '{{qid:<{max}}}  {{val}}'.format(max=(max_len + 1))
-        for qid in sorted(data.keys(), key=cmp_to_key(by_domain_then_user)):
+        for qid in sorted(data.keys(), key=by_domain_then_user):
             first = True
             val_list = data[qid]
             for val in val_list:
@@ -26,6 +26,13 @@ LOG = logging.getLogger(__name__)
 class PostfixLogSums(object):
     """A class for encaplsulating the results of parsing of postfix logfiles."""
 
+    stats_keys = frozenset(('msgs_total', 'messages_per_day', 'smtpd_per_day'))
+    hourly_stats_keys = frozenset((
+        'bounced_messages_per_hour', 'deferred_messages_per_hour',
+        'delivered_messages_per_hour', 'received_messages_per_hour',
+        'rejected_messages_per_hour'))
+    logdate_keys = frozenset(('logdate_latest', 'logdate_oldest'))
+
     # -------------------------------------------------------------------------
     def __init__(self, smtpd_stats=False):
         """Constructor."""
@@ -47,7 +54,7 @@ class PostfixLogSums(object):
     # -------------------------------------------------------------------------
     def reset(self):
         """Resetting all counters and result structs."""
-        self._files_index = None
+        self._cur_file = None
         self.amavis_msgs = 0
         self.bounced = {}
         self.bounced_messages_per_hour = HourlyStats()
@@ -102,8 +109,8 @@ class PostfixLogSums(object):
 
     # -------------------------------------------------------------------------
     def start_logfile(self, logfile):
-        """Creates an entry for a new logfile in self.files and sets self.files_index
-        to the index of the new created entry."""
+        """Creates an entry for a new logfile in self.files and keeps it as the
+        entry of the current logfile."""
         entry = {
             'file': logfile,
             'lines_total': 0,
@@ -111,21 +118,21 @@ class PostfixLogSums(object):
         }
 
         self.files.append(entry)
-        self._files_index = len(self.files) - 1
+        self._cur_file = entry
 
     # -------------------------------------------------------------------------
     def incr_lines_total(self, increment=1):
         """Increment all counters for all evaluated lines."""
         self.lines_total += increment
-        if self._files_index is not None:
-            self.files[self._files_index]['lines_total'] += increment
+        if self._cur_file is not None:
+            self._cur_file['lines_total'] += increment
 
     # -------------------------------------------------------------------------
     def incr_lines_considered(self, increment=1):
         """Increment all counters for all considered lines."""
         self.lines_considered += increment
-        if self._files_index is not None:
-            self.files[self._files_index]['lines_considered'] += increment
+        if self._cur_file is not None:
+            self._cur_file['lines_considered'] += increment
 
     # -------------------------------------------------------------------------
     def as_dict(self, short=True, pure=False):
@@ -140,18 +147,18 @@ class PostfixLogSums(object):
         """
 
         res = {}
-        for key in self.__dict__:
-            if short and key.startswith('_') and not key.startswith('__'):
+        for key, value in self.__dict__.items():
+            if short and key[0] == '_' and key[1:2] != '_':
                 continue
             # LOG.debug("Typecasting {!r} ...".format(key))
-            if key in ('msgs_total', 'messages_per_day', 'smtpd_per_day'):
-                res[key] = getattr(self, key).dict()
-            elif isinstance(getattr(self, key), CommonStatsDict):
-                res[key] = getattr(self, key).as_dict(pure=pure)
+            if key in self.stats_keys:
+                res[key] = value.dict()
+            elif isinstance(value, CommonStatsDict):
+                res[key] = value.as_dict(pure=pure)
             elif key == 'files':
                 if pure:
                     res[key] = []
-                    for f in self.files:
+                    for f in value:
                         fs = {
                             'file': str(f['file']),
                             'lines_considered': f['lines_considered'],
@@ -159,41 +166,25 @@ class PostfixLogSums(object):
                         }
                         res[key].append(fs)
                 else:
-                    res[key] = self.__dict__[key]
+                    res[key] = value
             elif key == 'smtpd_messages_per_hour':
                 # LOG.debug("Typecasting smtpd_messages_per_hour into a list ...")
-                if self.smtpd_messages_per_hour is None:
+                if value is None:
                     res[key] = None
                 else:
-                    res[key] = self.smtpd_messages_per_hour.as_list(pure=pure)
-            elif key in (
-                    'bounced_messages_per_hour', 'deferred_messages_per_hour',
-                    'delivered_messages_per_hour', 'received_messages_per_hour',
-                    'rejected_messages_per_hour'):
+                    res[key] = value.as_list(pure=pure)
+            elif key in self.hourly_stats_keys:
                 if pure:
-                    res[key] = getattr(self, key).as_list()
+                    res[key] = value.as_list()
                 else:
-                    res[key] = self.__dict__[key]
-            elif key in ('logdate_latest', 'logdate_oldest'):
-                if pure:
-                    dt = getattr(self, key, None)
-                    if dt:
-                        dt = dt.isoformat(' ')
-                    res[key] = dt
+                    res[key] = value
+            elif key in self.logdate_keys:
+                if pure and value:
+                    res[key] = value.isoformat(' ')
                 else:
-                    res[key] = self.__dict__[key]
-            elif key in ('messages_per_day', ):
-                if pure:
-                    stats_dict = getattr(self, key)
-                    if isinstance(stats_dict, dict):
-                        res[key] = {}
-                        for day in getattr(self, key).keys():
-                            stats = stats_dict[day].dict()
-                            res[key][day] = stats
-                    else:
-                        res[key] = None
+                    res[key] = value
             else:
-                res[key] = self.__dict__[key]
+                res[key] = value
 
         if not pure:
             res['__class_name__'] = self.__class__.__name__
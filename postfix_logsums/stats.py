@@ -9,15 +9,13 @@
 """
 from __future__ import absolute_import
 
-import copy
 import logging
 import datetime
 import re
 
-try:
-    from collections.abc import MutableMapping, Mapping, MutableSequence, Sequence
-except ImportError:
-    from collections import MutableMapping, Mapping, MutableSequence, Sequence
+from operator import attrgetter
+
+from collections.abc import MutableMapping, Mapping, MutableSequence, Sequence
 
 # Own modules
 from .errors import StatsError, WrongDateKeyError, WrongMsgStatsKeyError, WrongDailyKeyError
@@ -48,15 +46,34 @@ def is_sequence(arg):
 
 # =============================================================================
 class BaseMessageStats(MutableMapping):
-    """A base class for encapsulating message statistics."""
+    """A base class for encapsulating message statistics.
+
+    The statistics values are integer attributes in slots, which every subclass
+    declares for its own valid keys. All values are checked for being non-negative
+    integers, whether they are set as attribute, by key or by the constructor.
+    """
 
     valid_keys = ('value_one', 'value_two')
+    __slots__ = valid_keys
+    _valid_keys_set = frozenset(valid_keys)
+    _nr_keys = len(valid_keys)
+    # Returns a tuple of all values, as long as there are at least two valid keys.
+    _values_getter = attrgetter(*valid_keys)
+
+    # -------------------------------------------------------------------------
+    def __init_subclass__(cls, **kwargs):
+        """Set up the set, the number and the getter of the valid keys of the subclass."""
+        super(BaseMessageStats, cls).__init_subclass__(**kwargs)
+        cls._valid_keys_set = frozenset(cls.valid_keys)
+        cls._nr_keys = len(cls.valid_keys)
+        cls._values_getter = attrgetter(*cls.valid_keys)
 
     # -------------------------------------------------------------------------
     def __init__(self, first_param=None, **kwargs):
         """Constructor."""
 
-        self._values = {}
+        for key in self.valid_keys:
+            setattr(self, key, 0)
 
         if first_param is not None:
 
@@ -65,7 +82,7 @@ class BaseMessageStats(MutableMapping):
 
             if isinstance(first_param, Mapping):
                 self._update_from_mapping(first_param)
-            elif first_param.__class__.__name__ == 'zip':
+            elif isinstance(first_param, zip):
                 self._update_from_mapping(dict(first_param))
             else:
                 msg = _("Object is not a {m} object, but a {w} object instead.").format(
@@ -77,28 +94,33 @@ class BaseMessageStats(MutableMapping):
 
     # -------------------------------------------------------------------------
     def __getattr__(self, name):
-        """Getting the value of a non-pre-defined attribute, epecially the statistics
-        values."""
-        if name not in self.valid_keys:
-            raise WrongMsgStatsAttributeError(name, self.__class__.__name__)
-
-        if name not in self._values:
-            self._values[name] = 0
-
-        return self._values[name]
+        """Called only for attributes, which are not statistics values."""
+        raise WrongMsgStatsAttributeError(name, self.__class__.__name__)
 
     # -------------------------------------------------------------------------
     def __setattr__(self, name, value):
         """Called when an attribute assignment is attempted."""
-        if name in ('_values', ):
-            return super(BaseMessageStats, self).__setattr__(name, value)
-
-        if name not in self.valid_keys:
+        if name not in self._valid_keys_set:
             raise WrongMsgStatsAttributeError(name, self.__class__.__name__)
+        object.__setattr__(self, name, self._check_value(value))
+
+    # -------------------------------------------------------------------------
+    def __delattr__(self, name):
+        """Called, if an attribute should be deleted."""
+        msg = _("Deleting attribute {a!r} of a {w} is not allowed.").format(
+            a=name, w=self.__class__.__name__)
+        raise StatsError(msg)
+
+    # -------------------------------------------------------------------------
+    def _check_value(self, value):
+        """Return the given value as an integer, if it is a valid statistics value."""
+        # The parser nearly always gives a non-negative int.
+        if value.__class__ is int and value >= 0:
+            return value
 
         try:
             v = int(value)
-        except ValueError as e:
+        except (TypeError, ValueError) as e:
             msg = _("Wrong value {v!r} for a {w} value: {e}").format(
                 v=value, w=self.__class__.__name__, e=e)
             raise WrongMsgStatsValueError(msg)
@@ -108,36 +130,23 @@ class BaseMessageStats(MutableMapping):
                 v=value, w=self.__class__.__name__)
             raise WrongMsgStatsValueError(msg)
 
-        self._values[name] = v
-
-    # -------------------------------------------------------------------------
-    def __delattr__(self, name):
-        """Called, if an attribute should be deleted."""
-        msg = _("Deleting attribute {a!r} of a {w} is not allowed.").format(
-            a=name, w=self.__class__.__name__)
-        raise StatsError(msg)
+        return v
 
     # -------------------------------------------------------------------------
     def _update_from_mapping(self, mapping):
 
         for key in mapping.keys():
-            if isinstance(key, int) and key >= 0 and key < len(self.valid_keys):
-                key = self.valid_keys[key]
-            if key not in self.valid_keys:
-                raise WrongMsgStatsKeyError(key, self.__class__.__name__)
-            setattr(self, key, mapping[key])
+            setattr(self, self._get_key(key), mapping[key])
 
     # -----------------------------------------------------------
     def as_dict(self, pure=False):
         """Transforms the elements of the object into a dict."""
 
-        res = {}
-        if not pure:
-            res['__class_name__'] = self.__class__.__name__
+        if pure:
+            return dict(self.iteritems_pure())
 
-        for key in self.valid_keys:
-            value = getattr(self, key)
-            res[key] = value
+        res = {'__class_name__': self.__class__.__name__}
+        res.update(self.iteritems_pure())
 
         return res
 
@@ -149,15 +158,9 @@ class BaseMessageStats(MutableMapping):
     # -----------------------------------------------------------
     def __repr__(self):
         """Typecast for reproduction."""
-        ret = "{}(".format(self.__class__.__name__)
-        kargs = []
-        for pair in self.items():
-            arg = "{k}={v!r}".format(k=pair[0], v=pair[1])
-            kargs.append(arg)
-        ret += ', '.join(kargs)
-        ret += ')'
-
-        return ret
+        kargs = ', '.join(
+            '{k}={v!r}'.format(k=key, v=getattr(self, key)) for key in self.valid_keys)
+        return "{c}({a})".format(c=self.__class__.__name__, a=kargs)
 
     # -------------------------------------------------------------------------
     def __copy__(self):
@@ -169,24 +172,32 @@ class BaseMessageStats(MutableMapping):
         """Return a copy of the current set."""
         return self.__copy__()
 
+    # -------------------------------------------------------------------------
+    def _get_key(self, key):
+        """Return the name of the given key, which may also be the index of a key.
+
+        Raises a WrongMsgStatsKeyError, if it is not a valid key.
+        """
+        if isinstance(key, str):
+            if key in self._valid_keys_set:
+                return key
+        elif key.__class__ is int and key >= 0:
+            try:
+                return self.valid_keys[key]
+            except IndexError:
+                pass
+        raise WrongMsgStatsKeyError(key, self.__class__.__name__)
+
     # -------------------------------------------------------------------------
     def _get_item(self, key):
         """Return an arbitrary item by the key."""
-        if isinstance(key, int) and key >= 0 and key < len(self.valid_keys):
-            key = self.valid_keys[key]
-        if key not in self.valid_keys:
-            raise WrongMsgStatsKeyError(key)
-
-        return getattr(self, key, 0)
+        return getattr(self, self._get_key(key))
 
     # -------------------------------------------------------------------------
     def get(self, key):
         """Return an arbitrary item by the key."""
         return self._get_item(key)
 
-    # -------------------------------------------------------------------------
-    # The next four methods are requirements of the ABC.
-
     # -------------------------------------------------------------------------
     def __getitem__(self, key):
         """Return an arbitrary item by the key."""
@@ -201,21 +212,21 @@ class BaseMessageStats(MutableMapping):
     # -------------------------------------------------------------------------
     def __len__(self):
         """Return the the nuber of entries (keys) in this dict."""
-        return 4
+        return self._nr_keys
 
     # -------------------------------------------------------------------------
     def __contains__(self, key):
         """Return, whether the given key exists(the 'in'-operator)."""
-        if isinstance(key, int) and key >= 0 and key < len(self.valid_keys):
-            return True
-        if key in self.valid_keys:
+        if isinstance(key, str):
+            return key in self._valid_keys_set
+        if isinstance(key, int) and key >= 0 and key < self._nr_keys:
             return True
         return False
 
     # -------------------------------------------------------------------------
     def keys(self):
-        """Return a list with all keys in original notation."""
-        return copy.copy(self.valid_keys)
+        """Return a tuple with all keys in original notation."""
+        return self.valid_keys
 
     # -------------------------------------------------------------------------
     def items(self):
@@ -223,28 +234,25 @@ class BaseMessageStats(MutableMapping):
 
         An item is a tuple, with the key in original notation and the value.
         """
-        item_list = []
+        return list(self.iteritems_pure())
 
-        for key in self.keys():
-            value = self.get(key)
-            item_list.append((key, value))
+    # -------------------------------------------------------------------------
+    def iteritems_pure(self):
+        """Return an iterator over all items without building a dict or a list.
 
-        return item_list
+        An item is a tuple, with the key in original notation and the value.
+        """
+        return zip(self.valid_keys, self._values_getter(self))
 
     # -------------------------------------------------------------------------
     def values(self):
         """Return a list with all values of the current dict."""
-        return list(map(lambda x: self.get(x), self.keys()))
+        return list(self._values_getter(self))
 
     # -------------------------------------------------------------------------
     def __setitem__(self, key, value):
         """Set the value of the given key."""
-        if isinstance(key, int) and key >= 0 and key < len(self.valid_keys):
-            key = self.valid_keys[key]
-        if key not in self.valid_keys:
-            raise WrongMsgStatsKeyError(key)
-
-        setattr(self, key, value)
+        setattr(self, self._get_key(key), value)
 
     # -------------------------------------------------------------------------
     def set(self, key, value):
@@ -255,19 +263,22 @@ class BaseMessageStats(MutableMapping):
     def __delitem__(self, key):
         """Should delete the entry on the given key.
         But in real the value if this key set to zero instead."""
-        if isinstance(key, int) and key >= 0 and key < len(self.valid_keys):
-            key = self.valid_keys[key]
-        if key not in self.valid_keys:
-            raise WrongMsgStatsKeyError(key)
+        setattr(self, self._get_key(key), 0)
 
-        setattr(self, key, 0)
+    # -------------------------------------------------------------------------
+    def clear(self):
+        """Set all values to zero, because the keys cannot be removed."""
+        for key in self.valid_keys:
+            setattr(self, key, 0)
 
     # -------------------------------------------------------------------------
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
 
-        return self._values == other._values
+        return self.values() == other.values()
+
+    __hash__ = None
 
 
 # =============================================================================
@@ -275,6 +286,7 @@ class MessageStats(BaseMessageStats):
     """A class for encapsulating common message statistics."""
 
     valid_keys = ('count', 'size', 'defers', 'delay_avg', 'delay_max')
+    __slots__ = valid_keys
 
 
 # =============================================================================
@@ -282,6 +294,7 @@ class SmtpdStatsPerHour(BaseMessageStats):
     """A class for encapsulating message statistics per day."""
 
     valid_keys = ('count', 'time_total', 'time_max')
+    __slots__ = valid_keys
 
 
 # =============================================================================
@@ -289,6 +302,7 @@ class MessageStatsPerDay(BaseMessageStats):
     """A class for encapsulating message statistics per day."""
 
     valid_keys = ('received', 'sent', 'deferred', 'bounced', 'rejected')
+    __slots__ = valid_keys
 
 
 # =============================================================================
@@ -296,6 +310,7 @@ class SmtpdStats(BaseMessageStats):
     """A class for encapsulating smtpd statistics."""
 
     valid_keys = ('connections', 'connect_time_total', 'connect_time_max')
+    __slots__ = valid_keys
 
 
 # =============================================================================
@@ -307,6 +322,7 @@ class MessageStatsTotals(BaseMessageStats):
         'discarded', 'bounced', 'reject_warning', 'held', 'bytes_received',
         'bytes_delivered', 'sending_users', 'sending_domains', 'rcpt_users',
         'rcpt_domains', 'connections', 'master')
+    __slots__ = valid_keys
 
 
 # =============================================================================
@@ -333,7 +349,7 @@ class CommonStatsDict(dict):
             if isinstance(val, BaseMessageStats):
                 res[key] = val.as_dict(pure=pure)
             else:
-                res[key] = copy.copy(val)
+                res[key] = val
 
         return res
 
@@ -395,7 +411,7 @@ class DailyStatsDict(MutableMapping):
                 self._update_from_other(first_param)
             elif isinstance(first_param, Mapping):
                 self._update_from_mapping(first_param)
-            elif first_param.__class__.__name__ == 'zip':
+            elif isinstance(first_param, zip):
                 self._update_from_mapping(dict(first_param))
             else:
                 msg = _("Object is not a {m} object, but a {w} object instead.").format(
@@ -418,7 +434,8 @@ class DailyStatsDict(MutableMapping):
         """Return a copy of the current dict."""
         new = self.__class__(self._stats_class)
         for key in self:
-            new[key] = copy.copy(self[key])
+            # Assigning creates a new stats object from the given one.
+            new[key] = self[key]
 
         return new
 
@@ -521,18 +538,14 @@ class DailyStatsDict(MutableMapping):
 
         An item is a tuple, with the key in original notation and the value.
         """
-        item_list = []
-
-        for key in self.keys():
-            value = self._stats[key]
-            item_list.append((key, value))
-
-        return item_list
+        stats = self._stats
+        return [(key, stats[key]) for key in self.keys()]
 
     # -------------------------------------------------------------------------
     def values(self):
         """Return a list with all values of the current dict."""
-        return list(map(lambda x: self._stats[x], self.keys()))
+        stats = self._stats
+        return [stats[key] for key in self.keys()]
 
     # -------------------------------------------------------------------------
     def __eq__(self, other):
@@ -632,7 +645,7 @@ class DailyStatsDict(MutableMapping):
             self._update_from_other(other)
         elif isinstance(other, Mapping):
             self._update_from_mapping(other)
-        elif other.__class__.__name__ == 'zip':
+        elif isinstance(other, zip):
             self._update_from_mapping(dict(other))
         else:
             msg = _("Object is not a {m} object, but a {w} object instead.").format(
@@ -656,40 +669,41 @@ class HourlyStats(MutableSequence):
     """A class for encapsulating per hour message statistics."""
 
     hours_per_day = HOURS_PER_DAY
+    __slots__ = ('_list', )
 
     # -------------------------------------------------------------------------
     def __init__(self, *args):
         """Constructor."""
 
-        self._list = []
-        for hour in range(self.hours_per_day):
-            self._list.append(0)
+        self._list = [0] * self.hours_per_day
 
         if args:
             if len(args) > self.hours_per_day:
                 msg = _("Invalid number {} of statistics per hour given.").format(len(args))
                 raise StatsError(msg)
-            index = 0
-            for value in args:
+            for index, value in enumerate(args):
                 self[index] = value
-                index += 1
 
     # -------------------------------------------------------------------------
     def __repr__(self):
         """Typecast for reproduction."""
-        ret = "{}(".format(self.__class__.__name__)
-        pairs = []
-
-        for value in self:
-            pairs.append(repr(value))
-        ret += ', '.join(pairs) + ')'
-
-        return ret
+        return "{c}({v})".format(
+            c=self.__class__.__name__, v=', '.join(map(repr, self._list)))
 
     # -------------------------------------------------------------------------
     def as_list(self):
         """Typecasting into a simple list."""
-        return copy.copy(self._list)
+        return self._list.copy()
+
+    # -------------------------------------------------------------------------
+    def __eq__(self, other):
+        """Return the equality with another object (the '=='-operator)."""
+        if not isinstance(other, self.__class__):
+            return False
+
+        return self._list == other._list
+
+    __hash__ = None
 
     # -------------------------------------------------------------------------
     def __getitem__(self, hour):
@@ -698,66 +712,64 @@ class HourlyStats(MutableSequence):
 
     # -------------------------------------------------------------------------
     def __len__(self):
-        """Returns the length of the current array."""
-        return len(self._list)
+        """Returns the length of the current array, which is always one value per hour."""
+        return self.hours_per_day
 
     # -------------------------------------------------------------------------
     def __contains__(self, value):
         """Returns, whether the given value is one of the values in current list."""
-        for val in self:
-            if value == val:
-                return True
-        return False
+        return value in self._list
 
     # -------------------------------------------------------------------------
     def __iter__(self):
         """Return an iterator over all entries."""
-        for value in self._list:
-            yield value
+        return iter(self._list)
 
     # -------------------------------------------------------------------------
     def __reversed__(self):
         """Return an reversed iterator over all entries."""
-        index = len(self._list)
-        while index > 0:
-            index -= 1
-            yield self._list[index]
+        return reversed(self._list)
 
     # -------------------------------------------------------------------------
     def index(self, value, i=0, j=None):
         """index of the first occurrence of x in s (at or after index i and before index j)."""
 
         if j is None:
-            j = len(self._list)
-        while i < j:
-            if self._list[i] == value:
-                return i
-            i += 1
-
-        raise MsgStatsHourValNotfoundError(value)
+            j = self.hours_per_day
+        try:
+            return self._list.index(value, i, j)
+        except ValueError:
+            raise MsgStatsHourValNotfoundError(value)
 
     # -------------------------------------------------------------------------
     def count(self, value):
         """total number of occurrences of svaluex in current list."""
-        number = 0
-        for val in self:
-            if value == val:
-                number += 1
-
-        return number
+        return self._list.count(value)
 
     # -------------------------------------------------------------------------
     def __setitem__(self, hour, value):
         """Setting the value for the given hour."""
+        if value.__class__ is int and value >= 0:
+            self._list[hour] = value
+            return
+
         try:
             v = int(value)
-        except ValueError as e:
+        except (TypeError, ValueError) as e:
             msg = _("Wrong value {v!r} for a per hour stat: {e}").format(v=value, e=e)
             raise WrongMsgStatsValueError(msg)
         if v < 0:
             msg = _("Wrong value {v!r} for a per hour stat: must be >= 0").format(v=value)
             raise WrongMsgStatsValueError(msg)
-        self._list[hour] = int(value)
+        self._list[hour] = v
+
+    # -------------------------------------------------------------------------
+    def incr(self, hour, increment=1):
+        """Increment the value of the given hour.
+
+        This is done for nearly every log line, so the increment is not checked.
+        """
+        self._list[hour] += increment
 
     # -------------------------------------------------------------------------
     def __delitem__(self, hour):
@@ -814,23 +826,21 @@ class HourlyStats(MutableSequence):
 class HourlyStatsSmtpd(HourlyStats):
     """A class for encapsulating per hour message statistics."""
 
+    __slots__ = ()
+
     # -------------------------------------------------------------------------
     def __init__(self, *args):
         """Constructor."""
 
-        self._list = []
-        for hour in range(self.hours_per_day):
-            self._list.append(SmtpdStatsPerHour())
+        self._list = [SmtpdStatsPerHour() for hour in range(self.hours_per_day)]
 
         if args:
             if len(args) > self.hours_per_day:
                 msg = _("Invalid number {} of statistics per hour given.").format(len(args))
                 raise StatsError(msg)
-            index = 0
-            for value in args:
+            for index, value in enumerate(args):
                 if value is not None:
                     self[index] = value
-                index += 1
 
     # -------------------------------------------------------------------------
     def __setitem__(self, hour, value):
@@ -860,6 +870,12 @@ class HourlyStatsSmtpd(HourlyStats):
         msg = _("Wrong value {v!r} for a per hour stat.").format(v=value)
         raise WrongMsgStatsValueError(msg)
 
+    # -------------------------------------------------------------------------
+    def incr(self, hour, increment=1):
+        """Increment the value of the given hour - invalid action."""
+
+        raise MsgStatsHourInvalidMethodError('incr')
+
     # -------------------------------------------------------------------------
     def as_list(self, pure=False):
         """Typecasting into a simple list."""
@@ -14,7 +14,6 @@ from __future__ import absolute_import, print_function
 # Standard modules
 import logging
 import gettext
-import copy
 import sys
 
 try:
@@ -88,7 +87,7 @@ def format_list(lst, do_repr=False, style='standard', locale=DEFAULT_LOCALE):
     if not lst:
         return ''
 
-    my_list = copy.copy(lst)
+    my_list = list(lst)
     if do_repr:
         my_list = []
         for item in lst:
@@ -13,6 +13,8 @@ import sys
 import logging
 import datetime
 
+from collections.abc import Mapping
+
 try:
     import unittest2 as unittest
 except ImportError:
@@ -95,12 +97,24 @@ class TestStatsCollections(PostfixLogsumsTestcase):
         self.assertEqual(msg_stats.value_one, 6)
         self.assertEqual(msg_stats.value_two, 7)
 
+        LOG.debug("Testing the methods of a mapping ...")
+        self.assertIsInstance(msg_stats, Mapping)
+        msg_stats.update({'value_one': 1}, value_two=2)
+        self.assertEqual(msg_stats.values(), [1, 2])
+        self.assertEqual(msg_stats.pop('value_one'), 1)
+        self.assertEqual(msg_stats.value_one, 0)
+        self.assertEqual(msg_stats.setdefault('value_two', 5), 2)
+        msg_stats.clear()
+        self.assertEqual(msg_stats.values(), [0, 0])
+
     # -------------------------------------------------------------------------
     def test_base_stats_failures(self):
 
         LOG.info("Testing wrong attributes, keys or values of a BaseMessageStats object.")
 
         from postfix_logsums.errors import PostfixLogsumsError
+        from postfix_logsums.errors import WrongMsgStatsAttributeError
+        from postfix_logsums.errors import WrongMsgStatsKeyError, WrongMsgStatsValueError
         from postfix_logsums.stats import BaseMessageStats
 
         with self.assertRaises(PostfixLogsumsError) as cm:
@@ -134,12 +148,40 @@ class TestStatsCollections(PostfixLogsumsTestcase):
         e = cm.exception
         LOG.debug("%s raised: %s", e.__class__.__name__, e)
 
+        LOG.debug("Testing assignment of wrong attributes and values ...")
+
+        with self.assertRaises(WrongMsgStatsAttributeError) as cm:
+            msg_stats.uhu = 1
+        e = cm.exception
+        LOG.debug("%s raised: %s", e.__class__.__name__, e)
+
+        with self.assertRaises(WrongMsgStatsValueError) as cm:
+            msg_stats.value_one = 'abc'
+        e = cm.exception
+        LOG.debug("%s raised: %s", e.__class__.__name__, e)
+
+        with self.assertRaises(WrongMsgStatsValueError) as cm:
+            msg_stats.value_one = -5
+        e = cm.exception
+        LOG.debug("%s raised: %s", e.__class__.__name__, e)
+
+        msg_stats.value_one += 1
+        self.assertEqual(msg_stats.value_one, 7)
+
+        LOG.debug("Testing unhashable keys ...")
+        self.assertNotIn([1], msg_stats)
+        with self.assertRaises(WrongMsgStatsKeyError) as cm:
+            msg_stats[[1]]
+        e = cm.exception
+        LOG.debug("%s raised: %s", e.__class__.__name__, e)
+
     # -------------------------------------------------------------------------
     def test_common_msg_stats(self):
 
         LOG.info("Testing init and attributes of a MessageStats object.")
 
         from postfix_logsums.errors import PostfixLogsumsError
+        from postfix_logsums.errors import WrongMsgStatsAttributeError
         from postfix_logsums.stats import MessageStats
 
         LOG.debug("Testing init of an empty MessageStats object.")
@@ -167,17 +209,38 @@ class TestStatsCollections(PostfixLogsumsTestcase):
         got_keys = msg_stats.keys()
         LOG.debug("Got keys:\n" + pp(got_keys))
         self.assertEqual(exp_keys, got_keys)
+        self.assertEqual(len(msg_stats), len(exp_keys))
+        self.assertEqual(list(msg_stats.iteritems_pure()), msg_stats.items())
 
         LOG.debug("Testing access to attributes ...")
         msg_stats.count = 4
         msg_stats[0] = 3
         msg_stats['count'] = 2
 
+        LOG.debug("Testing the values in as_dict() ...")
+        msg_stats = MessageStats(count=2, size=1024)
+        got_dict = msg_stats.as_dict()
+        LOG.debug("Got as_dict():\n" + pp(got_dict))
+        self.assertEqual(got_dict['__class_name__'], 'MessageStats')
+        self.assertEqual(got_dict['count'], 2)
+        self.assertEqual(got_dict['size'], 1024)
+        got_dict = msg_stats.as_dict(pure=True)
+        self.assertEqual(got_dict['count'], 2)
+        self.assertEqual(got_dict['size'], 1024)
+
         with self.assertRaises(PostfixLogsumsError) as cm:
             msg_stats = MessageStats({'value_one': 1})
         e = cm.exception
         LOG.debug("%s raised: %s", e.__class__.__name__, e)
 
+        msg_stats = MessageStats()
+        for attribute in ('foo', 'value_one'):
+            LOG.debug("Testing assignment of the wrong attribute {!r} ...".format(attribute))
+            with self.assertRaises(WrongMsgStatsAttributeError) as cm:
+                setattr(msg_stats, attribute, 1)
+            e = cm.exception
+            LOG.debug("%s raised: %s", e.__class__.__name__, e)
+
         with self.assertRaises(PostfixLogsumsError) as cm:
             msg_stats = MessageStats(value_two=2)
         e = cm.exception
@@ -266,6 +329,8 @@ class TestStatsCollections(PostfixLogsumsTestcase):
         LOG.debug("Test setting correct value ...")
         msg_stats[3] = 5
         self.assertEqual(msg_stats[3], 5)
+        self.assertEqual(msg_stats, HourlyStats(0, 0, 0, 5))
+        self.assertNotEqual(msg_stats, HourlyStats())
 
         LOG.debug("Test setting incorrect value 'bla' ...")
         with self.assertRaises(ValueError) as cm:
@@ -285,6 +350,37 @@ class TestStatsCollections(PostfixLogsumsTestcase):
         e = cm.exception
         LOG.debug("%s raised: %s", e.__class__.__name__, e)
 
+        LOG.debug("Test incrementing values ...")
+        msg_stats.incr(3)
+        self.assertEqual(msg_stats[3], 6)
+        msg_stats.incr(23, 4)
+        self.assertEqual(msg_stats[23], 4)
+        self.assertEqual(msg_stats[22], 0)
+
+    # -------------------------------------------------------------------------
+    def test_hourly_stats_smtpd(self):
+
+        LOG.info("Testing init and attributes of a HourlyStatsSmtpd object ..""")
+
+        from postfix_logsums.errors import MsgStatsHourInvalidMethodError
+        from postfix_logsums.stats import HourlyStatsSmtpd, SmtpdStatsPerHour
+
+        msg_stats = HourlyStatsSmtpd()
+        LOG.debug("HourlyStatsSmtpd %r: {!r}".format(msg_stats))
+
+        for hour in range(24):
+            self.assertEqual(msg_stats[hour], SmtpdStatsPerHour())
+
+        msg_stats[5].count += 1
+        self.assertEqual(msg_stats[5].count, 1)
+
+        LOG.debug("Test incrementing a value ...")
+        with self.assertRaises(MsgStatsHourInvalidMethodError) as cm:
+            msg_stats.incr(5)
+        e = cm.exception
+        LOG.debug("%s raised: %s", e.__class__.__name__, e)
+        self.assertEqual(msg_stats[5].count, 1)
+
     # -------------------------------------------------------------------------
     def test_daily_stats(self):
 
@@ -349,6 +445,7 @@ if __name__ == '__main__':
     suite.addTest(TestStatsCollections('test_common_msg_stats', verbose))
     suite.addTest(TestStatsCollections('test_msg_stats_per_day', verbose))
     suite.addTest(TestStatsCollections('test_hourly_stats', verbose))
+    suite.addTest(TestStatsCollections('test_hourly_stats_smtpd', verbose))
     suite.addTest(TestStatsCollections('test_daily_stats', verbose))
 
     runner = unittest.TextTestRunner(verbosity=verbose)
@@ -59,6 +59,25 @@ class TestResults(PostfixLogsumsTestcase):
         if self.verbose > 2:
             LOG.debug("Dump as a pure dict:\n" + pp(dump))
 
+    # -------------------------------------------------------------------------
+    def test_nested_counters(self):
+
+        LOG.info("Testing the nested message counters of a PostfixLogSums object.")
+
+        from postfix_logsums import incr_counter
+        from postfix_logsums.results import PostfixLogSums
+
+        results = PostfixLogSums()
+
+        target = 'mx.uhu-banane.de'
+        incr_counter(results.smtp_messages, target, 'Connection refused')
+        incr_counter(results.smtp_messages, target, 'Connection refused')
+        incr_counter(results.smtp_messages, target, 'Connection timed out')
+        LOG.debug("Counted SMTP messages:\n" + pp(results.smtp_messages))
+
+        exp_counter = {target: {'Connection refused': 2, 'Connection timed out': 1}}
+        self.assertEqual(results.smtp_messages, exp_counter)
+
 
 # =============================================================================
 if __name__ == '__main__':
@@ -74,6 +93,7 @@ if __name__ == '__main__':
 
     suite.addTest(TestResults('test_import', verbose))
     suite.addTest(TestResults('test_init_results', verbose))
+    suite.addTest(TestResults('test_nested_counters', verbose))
 
     runner = unittest.TextTestRunner(verbosity=verbose)
 